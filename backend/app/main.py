@@ -7,6 +7,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.routers import data_cleaning
 from app.routers import district_anomalies
 from app.routers import insights
+from app.services.executors import shutdown_executors
 
 app = FastAPI(
     title="Aadhaar Pulse API",
@@ -29,6 +30,10 @@ app.include_router(data_cleaning.router)
 app.include_router(district_anomalies.router)
 app.include_router(insights.router)
 
+@app.on_event("shutdown")
+def shutdown_event():
+    shutdown_executors()
+
 @app.get("/")
 def root():
     return {"status": "Aadhaar Pulse backend running"}
@@ -1,29 +1,32 @@
 # app/routers/aggregations.py - ENTERPRISE GRADE NATIONAL DASHBOARD SUPPORT
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Query, Request
 from app.services.aggregations import (
     aggregate_national,
     aggregate_state, 
     aggregate_district
 )
+from app.services.executors import run_in
+from app.services.response_cache import cached_json
 
 router = APIRouter(prefix="/aggregate", tags=["Aggregations"])
 
 @router.get("/national")
-def national_overview():
+async def national_overview(request: Request):
     """National Aadhaar service demand overview - All states aggregated"""
-    return aggregate_national()
+    return await cached_json(request, lambda: run_in("aggregate", aggregate_national))
 
 @router.get("/state")
-def state_overview():
+async def state_overview(request: Request):
     """State-wise Aadhaar service distribution - For national map visualization"""
-    return aggregate_state()
+    return await cached_json(request, lambda: run_in("aggregate", aggregate_state))
 
 @router.get("/district")
-def district_overview(
+async def district_overview(
+    request: Request,
     state: str = Query(..., description="Exact state name as in dataset")
 ):
     """District-level breakdown for selected state"""
-    return aggregate_district(state)
+    return await cached_json(request, lambda: run_in("aggregate", aggregate_district, state))
 
 @router.get("/debug/pwd")
 def debug_pwd():
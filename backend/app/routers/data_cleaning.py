@@ -1,5 +1,6 @@
-from fastapi import APIRouter
-from app.services.data_cleaner import clean_dataset, load_logs
+from fastapi import APIRouter, Query
+from app.services.data_cleaner import clean_dataset, load_logs, CLEAN_CHUNK_ROWS
+from app.services.executors import run_in
 
 router = APIRouter(
     prefix="/data-cleaning",
@@ -7,14 +8,26 @@ router = APIRouter(
 )
 
 @router.post("/run/{dataset_name}")
-def run_cleaning(dataset_name: str):
+async def run_cleaning(
+    dataset_name: str,
+    streaming: bool = Query(False, description="Clean in bounded-memory chunks"),
+    chunksize: int = Query(CLEAN_CHUNK_ROWS, ge=1000, description="Rows per chunk when streaming"),
+    incremental: bool = Query(False, description="Clean only raw files added since the last run")
+):
     """
     dataset_name:
     - enrolment
     - biometric_update
     - demographic_update
+
+    Runs rebuild the whole dataset unless incremental=true. Incremental
+    runs fall back to a full rebuild when an already cleaned raw file
+    changed or was removed, or the cleaning rules changed.
     """
-    return clean_dataset(dataset_name)
+    return await run_in(
+        "aggregate", clean_dataset, dataset_name,
+        streaming=streaming, chunksize=chunksize, incremental=incremental
+    )
 
 
 @router.get("/logs")
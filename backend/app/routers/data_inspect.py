@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.services.data_loader import load_csv_folder
+from app.services.dataset_catalog import dataset_summary, sample_rows
 
 router = APIRouter(prefix="/data", tags=["Data Inspection"])
 
@@ -12,12 +12,12 @@ def get_column_names(dataset_name: str):
       - biometric_update
       - demographic_update
     """
-    df = load_csv_folder(dataset_name)
+    summary = dataset_summary(dataset_name)
 
     return {
         "dataset": dataset_name,
-        "total_rows": len(df),
-        "columns": list(df.columns)
+        "total_rows": summary["total_rows"],
+        "columns": summary["columns"]
     }
 
 @router.get("/sample/{dataset_name}")
@@ -25,10 +25,10 @@ def get_sample_rows(dataset_name: str, limit: int = 5):
     """
     Returns sample rows to visually inspect data
     """
-    df = load_csv_folder(dataset_name)
+    df = sample_rows(dataset_name, limit)
 
     return {
         "dataset": dataset_name,
         "sample_size": limit,
-        "data": df.head(limit).to_dict(orient="records")
+        "data": df.to_dict(orient="records")
     }
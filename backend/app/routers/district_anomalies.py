@@ -1,13 +1,37 @@
+from typing import Optional
 from fastapi import APIRouter, Query
-from app.services.district_anomaly_detector import detect_district_anomalies
+from app.services.district_anomaly_detector import (
+    detect_district_anomalies,
+    detect_national_district_anomalies
+)
+from app.services.executors import run_in
 
 router = APIRouter(
     prefix="/data-cleaning",
     tags=["Data Cleaning"]
 )
 
+@router.get("/district-anomalies/national")
+async def national_district_anomalies(
+    dataset: Optional[str] = Query(None, description="enrolment | biometric_update | demographic_update (default: all three)"),
+    similarity_cutoff: float = Query(0.9, ge=0.8, le=1.0),
+    min_count_ratio: float = Query(5.0, ge=1.0)
+):
+    """
+    Report potential near-duplicate district names for every state in one call.
+    Does NOT modify data.
+    """
+    return await run_in(
+        "aggregate",
+        detect_national_district_anomalies,
+        datasets=[dataset] if dataset else None,
+        similarity_cutoff=similarity_cutoff,
+        min_count_ratio=min_count_ratio
+    )
+
+
 @router.get("/district-anomalies")
-def district_anomalies(
+async def district_anomalies(
     state: str = Query(..., description="Exact state name"),
     dataset: str = Query("enrolment", description="enrolment | biometric_update | demographic_update"),
     similarity_cutoff: float = Query(0.9, ge=0.8, le=1.0),
@@ -17,7 +41,9 @@ def district_anomalies(
     Report potential near-duplicate district names within a state.
     Does NOT modify data.
     """
-    return detect_district_anomalies(
+    return await run_in(
+        "aggregate",
+        detect_district_anomalies,
         state=state,
         dataset=dataset,
         similarity_cutoff=similarity_cutoff,
@@ -1,10 +1,12 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 
 from app.services.aggregations import (
     aggregate_national,
     aggregate_state
 )
 from app.services.insight_engine import generate_national_insights
+from app.services.executors import run_in
+from app.services.response_cache import cached_json
 
 router = APIRouter(
     prefix="/insights",
@@ -13,7 +15,7 @@ router = APIRouter(
 
 
 @router.get("/national")
-def get_national_insights():
+async def get_national_insights(request: Request):
     """
     Generate deterministic national-level insights from Aadhaar datasets.
 
@@ -24,16 +26,19 @@ def get_national_insights():
     Returns:
     - Explainable, policy-grade insights (NO ML)
     """
-    try:
-        national_data = aggregate_national()
-        state_data = aggregate_state()
+    async def compute():
+        national_data = await run_in("aggregate", aggregate_national)
+        state_data = await run_in("aggregate", aggregate_state)
 
-        insights = generate_national_insights(
+        return await run_in(
+            "aggregate",
+            generate_national_insights,
             national_data=national_data,
             state_data=state_data
         )
 
-        return insights
+    try:
+        return await cached_json(request, compute)
 
     except Exception as e:
         raise HTTPException(
@@ -1,21 +1,48 @@
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Query, Request
 from app.services.aggregations import aggregate_district_with_station_estimate
 from app.services.station_estimator import WEIGHTS
+from app.services.executors import run_in
+from app.services.response_cache import cached_json
 
 router = APIRouter(
     prefix="/estimate",
     tags=["Demand Estimation"]
 )
 
+ASSUMPTION = {
+    "capacity": "1 station ≈ 25,000 weighted service units / year",
+    "weights": WEIGHTS
+}
+
+
 @router.get("/stations/district")
-def estimate_stations_by_district(
+async def estimate_stations_by_district(
+    request: Request,
     state: str = Query(..., description="Exact state name as in dataset")
 ):
-    return {
-        "assumption": {
-            "capacity": "1 station ≈ 25,000 weighted service units / year",
-            "weights": WEIGHTS
-        },
-        "state": state,
-        "data": aggregate_district_with_station_estimate(state)
-    }
+    async def compute():
+        return {
+            "assumption": ASSUMPTION,
+            "state": state,
+            "data": await run_in("aggregate", aggregate_district_with_station_estimate, state)
+        }
+
+    return await cached_json(request, compute)
+
+
+@router.get("/stations/national")
+async def estimate_stations_national(request: Request):
+    """
+    District-level station plan for every state in one call.
+    """
+    async def compute():
+        data = await run_in("aggregate", aggregate_district_with_station_estimate)
+
+        return {
+            "assumption": ASSUMPTION,
+            "total_districts": len(data),
+            "total_stations_needed": sum(r["estimated_stations_needed"] for r in data),
+            "data": data
+        }
+
+    return await cached_json(request, compute)
@@ -0,0 +1,240 @@
+"""
+Materialised rollups of the cleaned datasets.
+
+Each cleaned dataset is rolled up to (state, district, date) grain once per
+cleaning run (<dataset>_rollup). The three rollups are then merged into a
+single cube carrying all seven count columns (aggregate_cube), which the
+aggregation endpoints query instead of the raw rows.
+
+Each cleaning run also records how many rows every (state, district)
+has (<dataset>_district_counts), for the district anomaly checks.
+"""
+import pandas as pd
+from app.services.data_loader import (
+    load_clean_csv,
+    load_artifact,
+    write_artifact,
+    artifact_mtime
+)
+from app.services.time_utils import parse_dates
+
+ROLLUP_KEYS = ["state", "district", "date"]
+DISTRICT_KEYS = ["state", "district"]
+
+DATASET_COLUMNS = {
+    "enrolment": ["age_0_5", "age_5_17", "age_18_greater"],
+    "biometric_update": ["bio_age_5_17", "bio_age_17_"],
+    "demographic_update": ["demo_age_5_17", "demo_age_17_"],
+}
+
+COUNT_COLUMNS = [col for cols in DATASET_COLUMNS.values() for col in cols]
+
+CUBE_NAME = "aggregate_cube"
+
+
+def _rollup_name(dataset_name: str) -> str:
+    return f"{dataset_name}_rollup"
+
+
+def rollup_frame(df: pd.DataFrame, dataset_name: str) -> pd.DataFrame:
+    """
+    Sums one dataset's counts per (state, district, date) in memory.
+    """
+    count_cols = [c for c in DATASET_COLUMNS[dataset_name] if c in df.columns]
+
+    keys = df[["state", "district"]].copy()
+    keys["date"] = parse_dates(df["date"])
+
+    rollup = (
+        df[count_cols]
+        .groupby([keys["state"], keys["district"], keys["date"]], observed=True, dropna=False)
+        .sum()
+        .reset_index()
+    )
+    return rollup
+
+
+def combine_rollups(rollups) -> pd.DataFrame:
+    """
+    Re-sums partial rollups (e.g. one per streamed chunk) into one.
+    """
+    combined = pd.concat(rollups, ignore_index=True)
+    count_cols = [c for c in combined.columns if c not in ROLLUP_KEYS]
+
+    return (
+        combined
+        .groupby(ROLLUP_KEYS, observed=True, dropna=False)[count_cols]
+        .sum()
+        .reset_index()
+    )
+
+
+def build_dataset_rollup(
+    dataset_name: str,
+    df: pd.DataFrame = None,
+    rollup: pd.DataFrame = None
+) -> pd.DataFrame:
+    """
+    Rolls one cleaned dataset up to (state, district, date) and persists it.
+    A rollup already computed by the caller is persisted as-is.
+    """
+    if rollup is None:
+        if df is None:
+            df = load_clean_csv(dataset_name)
+        rollup = rollup_frame(df, dataset_name)
+
+    write_artifact(_rollup_name(dataset_name), rollup)
+    return rollup
+
+
+def _district_counts_name(dataset_name: str) -> str:
+    return f"{dataset_name}_district_counts"
+
+
+def district_counts_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Number of cleaned rows per (state, district).
+    """
+    return (
+        df.groupby(DISTRICT_KEYS, observed=True, dropna=False)
+        .size()
+        .rename("rows")
+        .reset_index()
+    )
+
+
+def combine_district_counts(parts) -> pd.DataFrame:
+    """
+    Re-sums partial district counts (e.g. one per streamed chunk) into one.
+    """
+    return (
+        pd.concat(parts, ignore_index=True)
+        .groupby(DISTRICT_KEYS, observed=True, dropna=False)["rows"]
+        .sum()
+        .reset_index()
+    )
+
+
+def build_district_counts(
+    dataset_name: str,
+    df: pd.DataFrame = None,
+    counts: pd.DataFrame = None
+) -> pd.DataFrame:
+    """
+    Counts one cleaned dataset's rows per (state, district) and persists
+    them. Counts already computed by the caller are persisted as-is.
+    """
+    if counts is None:
+        if df is None:
+            df = load_clean_csv(dataset_name, columns=DISTRICT_KEYS)
+        counts = district_counts_frame(df)
+
+    write_artifact(_district_counts_name(dataset_name), counts)
+    return counts
+
+
+def district_counts_fresh(dataset_name: str) -> bool:
+    return not _is_stale(_district_counts_name(dataset_name), [f"{dataset_name}_clean"])
+
+
+def load_district_counts(dataset_name: str) -> pd.DataFrame:
+    """
+    Returns the (state, district) -> rows table of one dataset,
+    rebuilding it first if the cleaned data is newer.
+    """
+    if not district_counts_fresh(dataset_name):
+        build_district_counts(dataset_name)
+
+    return load_artifact(_district_counts_name(dataset_name))
+
+
+def _is_stale(name: str, source_names) -> bool:
+    built = artifact_mtime(name)
+    if built is None:
+        return True
+
+    for source in source_names:
+        source_mtime = artifact_mtime(source)
+        if source_mtime is not None and source_mtime > built:
+            return True
+
+    return False
+
+
+def load_rollup(dataset_name: str) -> pd.DataFrame:
+    """
+    Returns the (state, district, date) rollup of one dataset,
+    rebuilding it first if the cleaned data is newer.
+    """
+    name = _rollup_name(dataset_name)
+
+    if _is_stale(name, [f"{dataset_name}_clean"]):
+        build_dataset_rollup(dataset_name)
+
+    rollup = load_artifact(name)
+    if not pd.api.types.is_datetime64_any_dtype(rollup["date"]):
+        # CSV fallback stores dates as ISO text
+        rollup = rollup.assign(date=pd.to_datetime(rollup["date"], errors="coerce"))
+    return rollup
+
+
+def build_cube() -> pd.DataFrame:
+    """
+    Merges the per-dataset rollups into the combined cube and persists it.
+    Cost is proportional to the number of (state, district, date) cells.
+    Datasets that have not been cleaned yet contribute zeros.
+    """
+    cube = None
+    for dataset_name in DATASET_COLUMNS:
+        if artifact_mtime(f"{dataset_name}_clean") is None:
+            continue
+
+        rollup = load_rollup(dataset_name)
+        rollup = rollup.astype({"state": str, "district": str})
+        if cube is None:
+            cube = rollup
+        else:
+            cube = cube.merge(rollup, on=ROLLUP_KEYS, how="outer")
+
+    if cube is None:
+        raise FileNotFoundError("No cleaned datasets found. Run data cleaning first.")
+
+    cube = cube.reindex(columns=ROLLUP_KEYS + COUNT_COLUMNS)
+    cube[COUNT_COLUMNS] = cube[COUNT_COLUMNS].fillna(0).astype("int64")
+    write_artifact(CUBE_NAME, cube)
+    return cube
+
+
+def refresh_dataset(
+    dataset_name: str,
+    df: pd.DataFrame = None,
+    rollup: pd.DataFrame = None,
+    district_counts: pd.DataFrame = None
+):
+    """
+    Called after a dataset is cleaned: rebuilds only that dataset's
+    rollup and district counts, then re-merges the cube from the three
+    rollups.
+    """
+    build_dataset_rollup(dataset_name, df=df, rollup=rollup)
+    build_district_counts(dataset_name, df=df, counts=district_counts)
+    build_cube()
+
+
+def load_cube() -> pd.DataFrame:
+    """
+    Returns the combined (state, district, date) cube with all seven
+    count columns, rebuilding it if any rollup is newer.
+    """
+    cleaned = [
+        d for d in DATASET_COLUMNS
+        if artifact_mtime(f"{d}_clean") is not None
+    ]
+    rollups = [_rollup_name(d) for d in cleaned]
+
+    if _is_stale(CUBE_NAME, rollups) or any(
+        _is_stale(_rollup_name(d), [f"{d}_clean"]) for d in cleaned
+    ):
+        build_cube()
+
+    return load_artifact(CUBE_NAME)
@@ -1,10 +1,13 @@
-import math
+import numpy as np
 import pandas as pd
-from app.services.data_loader import load_clean_csv
-from app.services.time_utils import get_time_span_days
+from app.services.aggregate_cube import (
+    load_cube,
+    load_rollup,
+    DATASET_COLUMNS,
+    COUNT_COLUMNS
+)
 from app.services.station_estimator import (
-    calculate_service_load,
-    estimate_stations,
+    WEIGHTS,
     ANNUAL_SERVICE_CAPACITY
 )
 
@@ -13,64 +16,36 @@ from app.services.station_estimator import (
 # ------------------------
 
 def aggregate_national():
-    enrol = load_clean_csv("enrolment")
-    bio = load_clean_csv("biometric_update")
-    demo = load_clean_csv("demographic_update")
+    cube = load_cube()
 
     return {
-        "enrolment": {
-            "age_0_5": int(enrol["age_0_5"].sum()),
-            "age_5_17": int(enrol["age_5_17"].sum()),
-            "age_18_greater": int(enrol["age_18_greater"].sum())
-        },
-        "biometric_update": {
-            "bio_age_5_17": int(bio["bio_age_5_17"].sum()),
-            "bio_age_17_": int(bio["bio_age_17_"].sum())
-        },
-        "demographic_update": {
-            "demo_age_5_17": int(demo["demo_age_5_17"].sum()),
-            "demo_age_17_": int(demo["demo_age_17_"].sum())
+        dataset_name: {
+            col: int(cube[col].sum())
+            for col in columns
         }
+        for dataset_name, columns in DATASET_COLUMNS.items()
     }
 
 
 def aggregate_state():
-    enrol = load_clean_csv("enrolment")
-    bio = load_clean_csv("biometric_update")
-    demo = load_clean_csv("demographic_update")
-
-    enrol_g = enrol.groupby("state").sum(numeric_only=True).reset_index()
-    bio_g = bio.groupby("state").sum(numeric_only=True).reset_index()
-    demo_g = demo.groupby("state").sum(numeric_only=True).reset_index()
-
+    cube = load_cube()
     merged = (
-        enrol_g
-        .merge(bio_g, on="state", how="outer")
-        .merge(demo_g, on="state", how="outer")
-        .fillna(0)
+        cube.groupby("state", observed=True)[COUNT_COLUMNS]
+        .sum()
+        .reset_index()
     )
 
     return merged.to_dict(orient="records")
 
 
 def aggregate_district(state_name: str):
-    enrol = load_clean_csv("enrolment")
-    bio = load_clean_csv("biometric_update")
-    demo = load_clean_csv("demographic_update")
-
-    enrol = enrol[enrol["state"] == state_name].drop(columns=["pincode"])
-    bio = bio[bio["state"] == state_name].drop(columns=["pincode"])
-    demo = demo[demo["state"] == state_name].drop(columns=["pincode"])
-
-    enrol_g = enrol.groupby("district").sum(numeric_only=True).reset_index()
-    bio_g = bio.groupby("district").sum(numeric_only=True).reset_index()
-    demo_g = demo.groupby("district").sum(numeric_only=True).reset_index()
+    cube = load_cube()
+    cube = cube[cube["state"] == state_name]
 
     merged = (
-        enrol_g
-        .merge(bio_g, on="district", how="outer")
-        .merge(demo_g, on="district", how="outer")
-        .fillna(0)
+        cube.groupby("district", observed=True)[COUNT_COLUMNS]
+        .sum()
+        .reset_index()
     )
 
     return merged.to_dict(orient="records")
@@ -79,69 +54,78 @@ def aggregate_district(state_name: str):
 # TIME UTILS
 # ------------------------
 
-def get_common_time_span_days(enrol, bio, demo) -> int:
-    enrol_days = get_time_span_days(enrol)
-    bio_days = get_time_span_days(bio)
-    demo_days = get_time_span_days(demo)
-
-    valid_days = [d for d in [enrol_days, bio_days, demo_days] if d > 0]
-    return min(valid_days) if valid_days else 0
+def _span_days(min_dates: pd.Series, max_dates: pd.Series) -> pd.Series:
+    """
+    Vectorised get_time_span_days: inclusive day count, 0 when unknown.
+    """
+    return ((max_dates - min_dates).dt.days + 1).fillna(0).astype("int64")
 
 # ------------------------
 # DISTRICT + STATION ESTIMATE (ANNUALISED)
 # ------------------------
 
-def aggregate_district_with_station_estimate(state_name: str):
-    enrol = load_clean_csv("enrolment")
-    bio = load_clean_csv("biometric_update")
-    demo = load_clean_csv("demographic_update")
+def _district_station_frame(state_name: str = None) -> pd.DataFrame:
+    """
+    One grouped pass per dataset over the (state, district, date) rollups:
+    per-district sums and date spans, then annualised load and stations
+    computed column-wise for every district at once.
+    """
+    keys = ["state", "district"]
+    per_dataset = []
+    span_cols = []
+
+    for dataset_name, columns in DATASET_COLUMNS.items():
+        rollup = load_rollup(dataset_name)
+        if state_name is not None:
+            rollup = rollup[rollup["state"] == state_name]
+
+        grouped = rollup.groupby(keys, observed=True).agg(
+            **{col: (col, "sum") for col in columns},
+            first_date=("date", "min"),
+            last_date=("date", "max")
+        )
 
-    enrol = enrol[enrol["state"] == state_name]
-    bio = bio[bio["state"] == state_name]
-    demo = demo[demo["state"] == state_name]
+        span_col = f"{dataset_name}_days"
+        grouped[span_col] = _span_days(grouped["first_date"], grouped["last_date"])
+        span_cols.append(span_col)
 
-    results = []
+        per_dataset.append(grouped[columns + [span_col]])
 
-    districts = set(enrol["district"]).union(
-        bio["district"]
-    ).union(
-        demo["district"]
-    )
+    # Outer-align on (state, district); absent datasets contribute zeros
+    frame = pd.concat(per_dataset, axis=1).fillna(0)
+    frame[COUNT_COLUMNS] = frame[COUNT_COLUMNS].astype("int64")
 
-    for district in districts:
-        enrol_d = enrol[enrol["district"] == district].drop(columns=["pincode"])
-        bio_d = bio[bio["district"] == district].drop(columns=["pincode"])
-        demo_d = demo[demo["district"] == district].drop(columns=["pincode"])
+    # Common window = shortest non-empty dataset span
+    days = frame[span_cols].where(frame[span_cols] > 0).min(axis=1)
+    frame["time_window_days"] = days.fillna(0).astype("int64")
 
-        days = get_common_time_span_days(enrol_d, bio_d, demo_d)
-        annual_factor = 365 / days if days > 0 else 1
+    annual_factor = (365 / days).fillna(1)
+    frame["annualisation_factor"] = annual_factor.round(2)
 
-        enrol_g = enrol_d.sum(numeric_only=True)
-        bio_g = bio_d.sum(numeric_only=True)
-        demo_g = demo_d.sum(numeric_only=True)
+    service_load_obs = 0
+    for col, weight in WEIGHTS.items():
+        service_load_obs = service_load_obs + frame[col] * weight
+    frame["service_load_observed"] = service_load_obs
+    frame["service_load_annualised"] = service_load_obs * annual_factor
 
-        row = {
-            "district": district,
-            **enrol_g.to_dict(),
-            **bio_g.to_dict(),
-            **demo_g.to_dict()
-        }
+    frame["estimated_stations_needed"] = (
+        np.ceil(frame["service_load_annualised"] / ANNUAL_SERVICE_CAPACITY)
+        .astype("int64")
+    )
 
-        service_load_obs = calculate_service_load(row)
-        service_load_ann = service_load_obs * annual_factor
+    return frame.drop(columns=span_cols).reset_index().sort_values(keys)
 
-        stations = math.ceil(
-            service_load_ann / ANNUAL_SERVICE_CAPACITY
-        )
 
-        row.update({
-            "time_window_days": days,
-            "annualisation_factor": round(annual_factor, 2),
-            "service_load_observed": service_load_obs,
-            "service_load_annualised": service_load_ann,
-            "estimated_stations_needed": stations
-        })
+def aggregate_district_with_station_estimate(state_name: str = None):
+    """
+    Per-district annualised service load and station estimate.
+
+    - state_name: restrict to one state; None plans every state at once
+      (rows then carry a "state" key)
+    """
+    frame = _district_station_frame(state_name)
 
-        results.append(row)
+    if state_name is not None:
+        frame = frame.drop(columns=["state"])
 
-    return results
+    return frame.to_dict(orient="records")
@@ -1,9 +1,31 @@
 import os
 import json
 import difflib
+import hashlib
+import threading
 import pandas as pd
+from collections import Counter
 from datetime import datetime
-from app.services.data_loader import load_csv_folder
+from app.services.data_loader import (
+    load_csv_folder,
+    iter_csv_chunks,
+    list_csv_files,
+    clear_dataset_cache,
+    write_clean_parquet,
+    parquet_available,
+    artifact_path,
+    ParquetChunkWriter
+)
+from app.services.response_cache import clear_response_cache
+from app.services.aggregate_cube import (
+    refresh_dataset,
+    load_rollup,
+    rollup_frame,
+    combine_rollups,
+    load_district_counts,
+    district_counts_frame,
+    combine_district_counts
+)
 
 # -----------------------------
 # CONFIG
@@ -12,9 +34,24 @@ from app.services.data_loader import load_csv_folder
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
 CLEAN_DATA_DIR = os.path.join(BASE_DIR, "data", "cleaned")
 LOG_FILE = os.path.join(CLEAN_DATA_DIR, "cleaning_log.json")
+STATE_RESOLUTION_FILE = os.path.join(CLEAN_DATA_DIR, "state_resolution.json")
 
 os.makedirs(CLEAN_DATA_DIR, exist_ok=True)
 
+# Rows per chunk in streaming mode; bounds peak memory independent of input size
+CLEAN_CHUNK_ROWS = int(os.getenv("CLEAN_CHUNK_ROWS", 200000))
+
+CORRECTIONS_SAMPLE_SIZE = 100
+
+# Bump when clean_common's column, district or pincode handling changes,
+# so incremental runs rebuild outputs cleaned under the old rules
+CLEANING_RULES_VERSION = 1
+
+# Bump when the layout of the persisted state resolution table changes
+RESOLUTION_TABLE_VERSION = 1
+
+HASH_BLOCK_BYTES = 1024 * 1024
+
 # Canonical list (ground truth)
 CANONICAL_STATES = [
     "Andhra Pradesh", "Arunachal Pradesh", "Assam", "Bihar", "Chhattisgarh",
@@ -114,22 +151,122 @@ def normalize_state_name(state, corrections, cutoff=0.9):
     return cleaned
 
 
+# -----------------------------
+# RESOLUTION TABLE
+# -----------------------------
+# Raw state strings number in the hundreds while rows number in the
+# millions, so each distinct string is normalised once and the result
+# (canonical name + the corrections it implies) is kept in a table that
+# persists across runs. The table is discarded whenever the canonical
+# list, aliases, cutoff or table layout change.
 
-def clean_common(df, corrections):
-    df = df.copy()
+_state_resolutions = {}
+_resolution_lock = threading.Lock()
 
-    # Column name normalisation
-    df.columns = (
-        df.columns
+
+def _resolution_rules_version(cutoff=0.9):
+    rules = json.dumps(
+        [RESOLUTION_TABLE_VERSION, CANONICAL_STATES, STATE_ALIASES, cutoff],
+        sort_keys=True
+    )
+    return hashlib.sha1(rules.encode("utf-8")).hexdigest()
+
+
+def _cleaning_rules_version():
+    """Everything that shapes cleaned rows: state resolution and clean_common's rules"""
+    rules = json.dumps([CLEANING_RULES_VERSION, _resolution_rules_version()])
+    return hashlib.sha1(rules.encode("utf-8")).hexdigest()
+
+
+def _load_resolution_table(version):
+    try:
+        with open(STATE_RESOLUTION_FILE, "r") as f:
+            table = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+    if table.get("rules_version") != version:
+        return {}
+    return table.get("resolutions", {})
+
+
+def _save_resolution_table(version, resolutions):
+    tmp_file = f"{STATE_RESOLUTION_FILE}.tmp"
+    with open(tmp_file, "w") as f:
+        json.dump({"rules_version": version, "resolutions": resolutions}, f, indent=2)
+    os.replace(tmp_file, STATE_RESOLUTION_FILE)
+
+
+def resolve_state_names(raw_values, cutoff=0.9) -> dict:
+    """
+    Maps each distinct raw state string to
+    {"state": canonical name or None, "corrections": [[type, from, to], ...]}
+    running normalize_state_name only for strings not seen before.
+    """
+    version = _resolution_rules_version(cutoff)
+
+    with _resolution_lock:
+        if version not in _state_resolutions:
+            _state_resolutions.clear()
+            _state_resolutions[version] = _load_resolution_table(version)
+        resolutions = _state_resolutions[version]
+
+        missing = [v for v in raw_values if v not in resolutions]
+        for raw in missing:
+            corrections = []
+            state = normalize_state_name(raw, corrections, cutoff=cutoff)
+            resolutions[raw] = {
+                "state": state,
+                "corrections": [[c["type"], c["from"], c["to"]] for c in corrections]
+            }
+
+        if missing:
+            _save_resolution_table(version, resolutions)
+
+        return {v: resolutions[v] for v in raw_values}
+
+
+def summarize_corrections(corrections: Counter, limit: int = None) -> list:
+    """
+    Aggregated correction records, most frequent first.
+    """
+    return [
+        {"type": kind, "from": source, "to": target, "count": count}
+        for (kind, source, target), count in corrections.most_common(limit)
+    ]
+
+
+def normalize_columns(columns) -> pd.Index:
+    return (
+        pd.Index(columns)
         .str.strip()
         .str.lower()
         .str.replace(" ", "_")
     )
 
-    # State cleaning (alias + fuzzy)
+
+def clean_common(df, corrections):
+    """
+    - corrections: Counter of (type, from, to) -> affected row count,
+      updated in place
+    """
+    df = df.copy()
+
+    # Column name normalisation
+    df.columns = normalize_columns(df.columns)
+
+    # State cleaning (alias + fuzzy), once per distinct value
     if "state" in df.columns:
-        df["state"] = df["state"].astype(str).apply(
-            lambda x: normalize_state_name(x, corrections)
+        raw_states = df["state"].astype(str)
+        raw_counts = raw_states.value_counts()
+        resolved = resolve_state_names(list(raw_counts.index))
+
+        for raw, rows in raw_counts.items():
+            for correction in resolved[raw]["corrections"]:
+                corrections[tuple(correction)] += int(rows)
+
+        df["state"] = raw_states.map(
+            {raw: entry["state"] for raw, entry in resolved.items()}
         )
 
         # 🔥 Drop invalid / garbage states
@@ -158,35 +295,389 @@ def clean_common(df, corrections):
 
 
 # -----------------------------
-# MAIN CLEAN FUNCTION
+# SOURCE MANIFEST
 # -----------------------------
+# Each dataset keeps a manifest of the raw files its cleaned outputs were
+# built from (name, size, mtime, sha256), plus the size of the cleaned CSV
+# it vouches for. Incremental runs clean only files missing from it and
+# append them; anything the manifest can't account for (a cleaned file
+# changed or vanished, new normalisation rules, outputs rewritten behind
+# its back) triggers a full rebuild instead.
 
-def clean_dataset(dataset_name: str):
-    corrections = []
+def _manifest_file(dataset_name):
+    return os.path.join(CLEAN_DATA_DIR, f"{dataset_name}_manifest.json")
 
-    df_raw = load_csv_folder(dataset_name)
-    df_clean = clean_common(df_raw, corrections)
 
-    output_file = os.path.join(
-        CLEAN_DATA_DIR,
-        f"{dataset_name}_clean.csv"
-    )
-    df_clean.to_csv(output_file, index=False)
+def load_manifest(dataset_name) -> dict:
+    try:
+        with open(_manifest_file(dataset_name), "r") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def _save_manifest(dataset_name, manifest):
+    manifest_file = _manifest_file(dataset_name)
+    tmp_file = f"{manifest_file}.tmp"
+    with open(tmp_file, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_file, manifest_file)
+
+
+def _file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while block := f.read(HASH_BLOCK_BYTES):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _fingerprint_sources(files, previous) -> dict:
+    """
+    name -> {"size", "mtime_ns", "sha256"} for each raw file. Files whose
+    size and mtime match the previous manifest keep their recorded hash
+    instead of being re-read.
+    """
+    sources = {}
+    for path in files:
+        name = os.path.basename(path)
+        stat = os.stat(path)
+        known = previous.get(name)
+
+        if known and (known["size"], known["mtime_ns"]) == (stat.st_size, stat.st_mtime_ns):
+            sha256 = known["sha256"]
+        else:
+            sha256 = _file_digest(path)
+
+        sources[name] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": sha256
+        }
+    return sources
+
+
+def _clean_output_file(dataset_name):
+    return os.path.join(CLEAN_DATA_DIR, f"{dataset_name}_clean.csv")
+
+
+def _rebuild_reason(dataset_name, manifest, sources, new_files):
+    if not manifest:
+        return "no manifest"
+
+    if manifest.get("rules_version") != _cleaning_rules_version():
+        return "cleaning rules changed"
+
+    output_file = _clean_output_file(dataset_name)
+    if not os.path.exists(output_file) or os.path.getsize(output_file) != manifest.get("output_size"):
+        return "cleaned output does not match manifest"
+
+    parquet_path = artifact_path(f"{dataset_name}_clean", "parquet")
+    if parquet_available():
+        if not os.path.exists(parquet_path):
+            return "parquet copy missing"
+        if not os.path.isdir(parquet_path):
+            # Single-file copies predate the partitioned layout
+            return "parquet copy not partitioned"
+
+    for name, entry in manifest["files"].items():
+        if name not in sources:
+            return f"{name} removed"
+        if sources[name]["sha256"] != entry["sha256"]:
+            return f"{name} changed"
+
+    # Appended rows must line up with the cleaned CSV's header
+    header = list(pd.read_csv(output_file, nrows=0).columns)
+    for path in new_files:
+        if list(normalize_columns(pd.read_csv(path, nrows=0).columns)) != header:
+            return f"{os.path.basename(path)} has different columns"
+
+    return None
+
+
+def plan_cleaning(dataset_name, files=None) -> dict:
+    """
+    Compares the raw folder with the dataset's manifest.
+
+    Returns {"mode", "files", "sources", "reason"}:
+    - mode "unchanged": every raw file is already cleaned
+    - mode "incremental": only `files` (new raw files) need cleaning
+    - mode "full": everything is rebuilt, `reason` says why
+    """
+    if files is None:
+        files = list_csv_files(dataset_name)
+
+    manifest = load_manifest(dataset_name)
+    sources = _fingerprint_sources(files, manifest.get("files", {}))
+    new_files = [p for p in files if os.path.basename(p) not in manifest.get("files", {})]
+
+    reason = _rebuild_reason(dataset_name, manifest, sources, new_files)
+    if reason is not None:
+        return {"mode": "full", "files": files, "sources": sources, "reason": reason}
+
+    return {
+        "mode": "incremental" if new_files else "unchanged",
+        "files": new_files,
+        "sources": sources,
+        "reason": None
+    }
+
+
+# -----------------------------
+# MAIN CLEAN FUNCTION
+# -----------------------------
+
+def _finish_cleaning(dataset_name, rows, output_file, parquet_file, corrections,
+                     mode, files):
+    corrections_count = sum(corrections.values())
 
     # Save log entry
     log_entry = {
         "dataset": dataset_name,
         "timestamp": datetime.utcnow().isoformat(),
-        "rows_processed": len(df_clean),
-        "corrections_count": len(corrections),
-        "corrections_sample": corrections[:100]
+        "mode": mode,
+        "source_files": [os.path.basename(f) for f in files],
+        "rows_processed": rows,
+        "corrections_count": corrections_count,
+        "corrections_sample": summarize_corrections(corrections, CORRECTIONS_SAMPLE_SIZE)
 
     }
     save_log(log_entry)
 
+    # Cached aggregate / insight responses describe the previous data
+    clear_response_cache()
+
     return {
         "dataset": dataset_name,
-        "rows": len(df_clean),
+        "mode": mode,
+        "source_files": log_entry["source_files"],
+        "rows": rows,
         "output_file": output_file,
-        "corrections_count": len(corrections)
+        "parquet_file": parquet_file,
+        "corrections_count": corrections_count
     }
+
+
+def clean_dataset(dataset_name: str, streaming: bool = False,
+                  chunksize: int = CLEAN_CHUNK_ROWS, incremental: bool = False):
+    """
+    - streaming: read, clean and write the raw folder chunk by chunk
+      (peak memory bounded by `chunksize` rows instead of the dataset)
+    - incremental: clean only raw files not in the dataset's manifest and
+      append them to the cleaned outputs and rollups; falls back to a
+      full rebuild when the manifest can't vouch for the existing outputs
+    """
+    files = list_csv_files(dataset_name)
+    manifest = load_manifest(dataset_name)
+
+    if incremental:
+        plan = plan_cleaning(dataset_name, files)
+    else:
+        plan = {
+            "mode": "full",
+            "files": files,
+            "sources": _fingerprint_sources(files, manifest.get("files", {}))
+        }
+
+    if plan["mode"] == "unchanged":
+        # Only mtimes may have moved; outputs and caches stay valid
+        manifest["files"] = plan["sources"]
+        _save_manifest(dataset_name, manifest)
+        parquet_file = artifact_path(f"{dataset_name}_clean", "parquet")
+        return {
+            "dataset": dataset_name,
+            "mode": "unchanged",
+            "source_files": [],
+            "rows": 0,
+            "output_file": _clean_output_file(dataset_name),
+            "parquet_file": parquet_file if os.path.exists(parquet_file) else None,
+            "corrections_count": 0
+        }
+
+    if plan["mode"] == "incremental":
+        rows, parquet_file, corrections = _append_clean_files(
+            dataset_name, plan["files"], streaming, chunksize
+        )
+        total_rows = manifest["rows"] + rows
+    elif streaming:
+        rows, parquet_file, corrections = _clean_dataset_streaming(dataset_name, chunksize, files)
+        total_rows = rows
+    else:
+        rows, parquet_file, corrections = _clean_dataset_in_memory(dataset_name, files)
+        total_rows = rows
+
+    output_file = _clean_output_file(dataset_name)
+    _save_manifest(dataset_name, {
+        "rules_version": _cleaning_rules_version(),
+        "rows": total_rows,
+        "output_size": os.path.getsize(output_file),
+        "files": plan["sources"]
+    })
+
+    return _finish_cleaning(
+        dataset_name,
+        rows=rows,
+        output_file=output_file,
+        parquet_file=parquet_file,
+        corrections=corrections,
+        mode=plan["mode"],
+        files=plan["files"]
+    )
+
+
+def _clean_dataset_in_memory(dataset_name: str, files):
+    corrections = Counter()
+
+    df_raw = load_csv_folder(dataset_name, files=files)
+    df_clean = clean_common(df_raw, corrections)
+
+    df_clean.to_csv(_clean_output_file(dataset_name), index=False)
+
+    # Typed columnar copy for fast reads (skipped without pyarrow)
+    parquet_file = write_clean_parquet(dataset_name, df_clean)
+    clear_dataset_cache(dataset_name)
+
+    # Rebuild this dataset's rollup and the combined aggregate cube
+    refresh_dataset(dataset_name, df_clean)
+
+    return len(df_clean), parquet_file, corrections
+
+
+def _streaming_header(files) -> list:
+    """
+    Normalised header of the first file. Every chunk is written under it,
+    so the other files must have the same columns (in any order).
+    """
+    header = list(normalize_columns(pd.read_csv(files[0], nrows=0).columns))
+    for path in files[1:]:
+        columns = list(normalize_columns(pd.read_csv(path, nrows=0).columns))
+        if sorted(columns) != sorted(header):
+            raise ValueError(
+                f"{os.path.basename(path)} columns {columns} differ from "
+                f"{os.path.basename(files[0])} columns {header}"
+            )
+    return header
+
+
+def _clean_dataset_streaming(dataset_name: str, chunksize: int, files):
+    output_file = _clean_output_file(dataset_name)
+    tmp_output = f"{output_file}.partial"
+
+    # Checked before anything is written
+    header = _streaming_header(files)
+
+    parquet_writer = (
+        ParquetChunkWriter(f"{dataset_name}_clean")
+        if parquet_available() else None
+    )
+
+    rows = 0
+    chunks = 0
+    corrections = Counter()
+    rollup = None
+    district_counts = None
+
+    try:
+        for df_raw in iter_csv_chunks(dataset_name, chunksize, files=files):
+            df_clean = clean_common(df_raw, corrections)[header]
+
+            df_clean.to_csv(
+                tmp_output,
+                mode="w" if chunks == 0 else "a",
+                header=chunks == 0,
+                index=False
+            )
+            if parquet_writer is not None:
+                parquet_writer.write(df_clean)
+
+            # Rollups stay at (state, district, date) grain, so folding
+            # each chunk in keeps them small
+            part = rollup_frame(df_clean, dataset_name)
+            rollup = part if rollup is None else combine_rollups([rollup, part])
+
+            part = district_counts_frame(df_clean)
+            district_counts = (
+                part if district_counts is None
+                else combine_district_counts([district_counts, part])
+            )
+
+            rows += len(df_clean)
+            chunks += 1
+
+    except Exception:
+        if parquet_writer is not None:
+            parquet_writer.abort()
+        if os.path.exists(tmp_output):
+            os.remove(tmp_output)
+        raise
+
+    if chunks == 0:
+        # Nothing was read, so nothing was written; the in-memory path
+        # produces the same empty outputs and "no data" result
+        if parquet_writer is not None:
+            parquet_writer.abort()
+        return _clean_dataset_in_memory(dataset_name, files)
+
+    os.replace(tmp_output, output_file)
+    parquet_file = parquet_writer.close() if parquet_writer is not None else None
+    clear_dataset_cache(dataset_name)
+
+    refresh_dataset(dataset_name, rollup=rollup, district_counts=district_counts)
+
+    return rows, parquet_file, corrections
+
+
+def _append_clean_files(dataset_name: str, files, streaming: bool, chunksize: int):
+    """
+    Cleans only `files` and appends them: rows to the cleaned CSV, a new
+    part to the partitioned Parquet copy, sums to the existing rollup and
+    district counts. Work is proportional to the new files; the cube
+    re-merge is proportional to the number of (state, district, date)
+    cells.
+    """
+    output_file = _clean_output_file(dataset_name)
+
+    # Read before the cleaned outputs change, or they would look stale
+    # and be rebuilt from the full dataset
+    rollup = load_rollup(dataset_name)
+    district_counts = load_district_counts(dataset_name)
+
+    parquet_writer = (
+        ParquetChunkWriter(f"{dataset_name}_clean", append=True)
+        if parquet_available() else None
+    )
+    frames = (
+        iter_csv_chunks(dataset_name, chunksize, files=files)
+        if streaming else [load_csv_folder(dataset_name, files=files)]
+    )
+
+    rows = 0
+    corrections = Counter()
+    start_size = os.path.getsize(output_file)
+
+    try:
+        for df_raw in frames:
+            df_clean = clean_common(df_raw, corrections)
+
+            df_clean.to_csv(output_file, mode="a", header=False, index=False)
+            if parquet_writer is not None:
+                parquet_writer.write(df_clean)
+
+            rollup = combine_rollups([rollup, rollup_frame(df_clean, dataset_name)])
+            district_counts = combine_district_counts(
+                [district_counts, district_counts_frame(df_clean)]
+            )
+            rows += len(df_clean)
+
+    except Exception:
+        if parquet_writer is not None:
+            parquet_writer.abort()
+        os.truncate(output_file, start_size)
+        raise
+
+    parquet_file = parquet_writer.close() if parquet_writer is not None else None
+    clear_dataset_cache(dataset_name)
+
+    refresh_dataset(dataset_name, rollup=rollup, district_counts=district_counts)
+
+    return rows, parquet_file, corrections
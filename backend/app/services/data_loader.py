@@ -1,51 +1,517 @@
 import os
+import re
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
 import pandas as pd
 
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as pads
+    import pyarrow.parquet as pq
+except ImportError:  # parquet artifacts are optional; CSV stays the fallback
+    pa = None
+    pads = None
+    pq = None
+
 BASE_DATA_PATH = os.path.join(
     os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
     "data"
 )
 
-def load_csv_folder(folder_name: str) -> pd.DataFrame:
+# Upper bound for the in-memory cleaned dataset cache (bytes).
+# Least recently used datasets are evicted once the budget is exceeded.
+CACHE_MAX_BYTES = int(os.getenv("DATASET_CACHE_MAX_BYTES", 384 * 1024 * 1024))
+
+CATEGORICAL_COLUMNS = ["date", "state", "district", "pincode"]
+
+# (dataset_name, columns) -> (file_signature, DataFrame, nbytes)
+_dataset_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+# Raw identifier columns are read as text so pincodes keep their digits
+# and dates are not guessed at; count columns keep the parser's inference.
+RAW_TEXT_DTYPES = {"date": str, "state": str, "district": str, "pincode": str}
+
+# Rows per chunk when the CSV fallback is scanned with a filter
+FILTERED_READ_CHUNK_ROWS = 500000
+
+# Files of one folder parsed concurrently by load_csv_folder
+CSV_LOAD_WORKERS = int(os.getenv("CSV_LOAD_WORKERS", min(8, os.cpu_count() or 1)))
+
+# api_data_aadhar_<dataset>_<start>_<end>.csv
+_SLICE_PATTERN = re.compile(r"_(\d+)_(\d+)\.csv$")
+
+
+def _slice_order(path: str):
+    match = _SLICE_PATTERN.search(os.path.basename(path))
+    if match is None:
+        return (1, 0, os.path.basename(path))
+    return (0, int(match.group(1)), os.path.basename(path))
+
+
+def list_csv_files(folder_name: str) -> list:
     """
-    Reads all CSV files from a given data subfolder
-    and concatenates them into a single DataFrame.
+    CSV files of a data subfolder, ordered by their API slice offsets
+    so row order is the same on every host.
     """
     folder_path = os.path.join(BASE_DATA_PATH, folder_name)
 
     if not os.path.exists(folder_path):
         raise FileNotFoundError(f"Folder not found: {folder_name}")
 
-    csv_files = [
-        os.path.join(folder_path, f)
-        for f in os.listdir(folder_path)
-        if f.endswith(".csv")
-    ]
+    csv_files = sorted(
+        (
+            os.path.join(folder_path, f)
+            for f in os.listdir(folder_path)
+            if f.endswith(".csv")
+        ),
+        key=_slice_order
+    )
 
     if not csv_files:
         raise ValueError(f"No CSV files found in {folder_name}")
 
-    df_list = [pd.read_csv(file) for file in csv_files]
-    combined_df = pd.concat(df_list, ignore_index=True)
+    return csv_files
+
+
+def _read_raw_csv(path: str, usecols=None) -> pd.DataFrame:
+    if usecols is not None:
+        header = pd.read_csv(path, nrows=0).columns
+        usecols = [c for c in usecols if c in header]
+
+    return pd.read_csv(
+        path,
+        usecols=usecols,
+        dtype=RAW_TEXT_DTYPES,
+        engine="pyarrow" if pa is not None else "c"
+    )
+
+
+def load_csv_folder(folder_name: str, usecols=None, files=None) -> pd.DataFrame:
+    """
+    Reads all CSV files from a given data subfolder
+    and concatenates them into a single DataFrame.
+
+    - usecols: optional subset of columns to parse (missing names are ignored)
+    - files: optional explicit list of paths (default: list_csv_files)
+
+    Files are parsed in parallel (CSV_LOAD_WORKERS threads; both parsers
+    release the GIL) and concatenated once, in slice order.
+    """
+    csv_files = files if files is not None else list_csv_files(folder_name)
+
+    if len(csv_files) == 1 or CSV_LOAD_WORKERS <= 1:
+        df_list = [_read_raw_csv(file, usecols) for file in csv_files]
+    else:
+        workers = min(CSV_LOAD_WORKERS, len(csv_files))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            df_list = list(pool.map(lambda file: _read_raw_csv(file, usecols), csv_files))
+
+    if len(df_list) == 1:
+        return df_list[0]
+
+    return pd.concat(df_list, ignore_index=True)
+
+
+def iter_csv_chunks(folder_name: str, chunksize: int, files=None):
+    """
+    Streams every CSV in a data subfolder (or just `files`) as DataFrames
+    of at most `chunksize` rows, so callers never hold a whole folder in
+    memory.
+    """
+    for file in files if files is not None else list_csv_files(folder_name):
+        with pd.read_csv(file, chunksize=chunksize, dtype=RAW_TEXT_DTYPES) as reader:
+            for chunk in reader:
+                yield chunk
+
+
+# -----------------------------
+# CLEANED DATASET CACHE
+# -----------------------------
+
+def optimize_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Shrinks a cleaned frame in place:
+    - low-cardinality text columns become categoricals
+    - integer count columns are downcast to the narrowest integer type
+    """
+    for col in CATEGORICAL_COLUMNS:
+        if col not in df.columns or isinstance(df[col].dtype, pd.CategoricalDtype):
+            continue
+
+        if col == "pincode":
+            df[col] = df[col].astype(str).str.zfill(6).astype("category")
+        elif pd.api.types.is_string_dtype(df[col].dtype):
+            df[col] = df[col].astype("category")
+
+    for col in df.select_dtypes(include="integer").columns:
+        df[col] = pd.to_numeric(df[col], downcast="integer")
+
+    return df
+
+
+def _file_signature(path: str):
+    stat = os.stat(path)
+    if os.path.isdir(path):
+        # Partitioned Parquet dataset: adding or replacing a part moves
+        # the directory's mtime
+        return (stat.st_mtime_ns, sum(os.path.getsize(p) for p in dataset_parts(path)))
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _evict_over_budget():
+    total = sum(entry[2] for entry in _dataset_cache.values())
+
+    # Always keep the most recently used dataset, even if it alone
+    # exceeds the budget.
+    while total > CACHE_MAX_BYTES and len(_dataset_cache) > 1:
+        _, (_, _, nbytes) = _dataset_cache.popitem(last=False)
+        total -= nbytes
+
+
+def clear_dataset_cache(dataset_name: str = None):
+    """
+    Drops every cached table derived from one dataset
+    (e.g. enrolment_clean, enrolment_rollup), or everything.
+    """
+    with _cache_lock:
+        if dataset_name is None:
+            _dataset_cache.clear()
+            return
+
+        for key in [k for k in _dataset_cache if k[0].startswith(dataset_name)]:
+            del _dataset_cache[key]
+
+
+def dataset_cache_info() -> dict:
+    """
+    Summary of what is currently held in the dataset cache.
+    """
+    with _cache_lock:
+        return {
+            "max_bytes": CACHE_MAX_BYTES,
+            "used_bytes": sum(entry[2] for entry in _dataset_cache.values()),
+            "datasets": [
+                {"table": name, "columns": list(cols) if cols else None}
+                for name, cols in _dataset_cache.keys()
+            ]
+        }
+
+
+# -----------------------------
+# PARQUET ARTIFACTS
+# -----------------------------
+
+def parquet_available() -> bool:
+    return pq is not None
+
+
+def _arrow_schema(table):
+    """
+    Fixed on-disk schema: dictionary-encoded text columns and
+    32-bit integer counts (64-bit only where values need it).
+    """
+    fields = []
+    for field in table.schema:
+        arrow_type = field.type
+        value_type = (
+            arrow_type.value_type
+            if pa.types.is_dictionary(arrow_type)
+            else arrow_type
+        )
+        if pa.types.is_string(value_type) or pa.types.is_large_string(value_type):
+            arrow_type = pa.dictionary(pa.int32(), pa.string())
+        elif pa.types.is_integer(arrow_type):
+            arrow_type = pa.int64() if arrow_type.bit_width > 32 else pa.int32()
+        fields.append(pa.field(field.name, arrow_type))
+    return pa.schema(fields)
+
+
+def to_arrow_table(df: pd.DataFrame):
+    df = optimize_dtypes(df.copy(deep=False))
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    return table.cast(_arrow_schema(table))
+
+
+def artifact_path(name: str, ext: str) -> str:
+    return os.path.join(BASE_DATA_PATH, "cleaned", f"{name}.{ext}")
 
-    return combined_df
 
+def _write_parquet(name: str, df: pd.DataFrame) -> str:
+    output_file = artifact_path(name, "parquet")
+    tmp_file = f"{output_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+    pq.write_table(to_arrow_table(df), tmp_file)
+    os.replace(tmp_file, output_file)
+    return output_file
 
-def load_clean_csv(dataset_name: str) -> pd.DataFrame:
+
+def write_clean_parquet(dataset_name: str, df: pd.DataFrame):
+    """
+    Writes the typed columnar copy of a cleaned dataset next to its CSV
+    (a partitioned dataset with a single part).
+    Returns the output path, or None when pyarrow is not installed.
     """
-    Loads a cleaned CSV file from backend/data/cleaned/
-    Example: enrolment_clean.csv
+    if not parquet_available():
+        return None
+
+    writer = ParquetChunkWriter(f"{dataset_name}_clean")
+    try:
+        writer.write(df)
+    except Exception:
+        writer.abort()
+        raise
+    return writer.close()
+
+
+def dataset_parts(path: str) -> list:
     """
-    cleaned_path = os.path.join(
-        BASE_DATA_PATH,
-        "cleaned",
-        f"{dataset_name}_clean.csv"
+    Part files of a partitioned Parquet dataset, oldest first. Names
+    starting with "." (parts being written) are skipped, as pyarrow's
+    dataset discovery does.
+    """
+    return sorted(
+        os.path.join(path, f)
+        for f in os.listdir(path)
+        if f.endswith(".parquet") and not f.startswith(".")
     )
 
-    if not os.path.exists(cleaned_path):
+
+def _replace_path(src: str, dst: str):
+    """Moves src over dst, whether dst is a file, a directory or missing"""
+    old = None
+    if os.path.lexists(dst):
+        old = f"{dst}.{os.getpid()}.{threading.get_ident()}.old"
+        os.rename(dst, old)
+    os.rename(src, dst)
+
+    if old is not None:
+        if os.path.isdir(old):
+            shutil.rmtree(old)
+        else:
+            os.remove(old)
+
+
+class ParquetChunkWriter:
+    """
+    Writes frames as row groups of one new part file of the <name>.parquet
+    dataset directory. The part is written under a hidden temp name and
+    renamed into place on close(), so readers never see a half-written
+    part.
+
+    - append: add the part to the existing dataset, keeping its schema;
+      existing parts are not read or rewritten. Otherwise the part goes
+      to a fresh directory that replaces the dataset on close().
+    """
+
+    def __init__(self, name: str, append: bool = False):
+        self.name = name
+        self.output_dir = artifact_path(name, "parquet")
+        self.append = append and os.path.isdir(self.output_dir)
+        self.part_dir = (
+            self.output_dir if self.append
+            else f"{self.output_dir}.{os.getpid()}.{threading.get_ident()}.tmp"
+        )
+        self.tmp_file = os.path.join(
+            self.part_dir, f".part.{os.getpid()}.{threading.get_ident()}.tmp"
+        )
+        self._writer = None
+
+    def _open(self, schema):
+        if self.append:
+            parts = dataset_parts(self.output_dir)
+            if parts:
+                schema = pq.read_schema(parts[0])
+        else:
+            os.makedirs(self.part_dir)
+        self._writer = pq.ParquetWriter(self.tmp_file, schema)
+
+    def _next_part(self) -> str:
+        matches = (
+            re.fullmatch(r"part-(\d+)\.parquet", os.path.basename(p))
+            for p in dataset_parts(self.part_dir)
+        )
+        numbers = [int(m.group(1)) for m in matches if m]
+        return os.path.join(self.part_dir, f"part-{max(numbers, default=-1) + 1:05d}.parquet")
+
+    def write(self, df: pd.DataFrame):
+        table = to_arrow_table(df)
+        if self._writer is None:
+            self._open(table.schema)
+        self._writer.write_table(table.cast(self._writer.schema))
+
+    def close(self) -> str:
+        if self._writer is None:
+            return None
+        self._writer.close()
+        os.replace(self.tmp_file, self._next_part())
+        if not self.append:
+            _replace_path(self.part_dir, self.output_dir)
+        clear_dataset_cache(self.name)
+        return self.output_dir
+
+    def abort(self):
+        if self._writer is not None:
+            self._writer.close()
+        if os.path.exists(self.tmp_file):
+            os.remove(self.tmp_file)
+        if not self.append and os.path.isdir(self.part_dir):
+            shutil.rmtree(self.part_dir)
+
+
+def write_artifact(name: str, df: pd.DataFrame) -> str:
+    """
+    Persists a derived table (rollups, cubes, ...) under data/cleaned/,
+    as Parquet when available and CSV otherwise.
+    """
+    if parquet_available():
+        output_file = _write_parquet(name, df)
+    else:
+        output_file = artifact_path(name, "csv")
+        df.to_csv(output_file, index=False)
+
+    clear_dataset_cache(name)
+    return output_file
+
+
+def _resolve_source(name: str):
+    """
+    Picks the freshest artifact for a name, preferring parquet when it
+    is at least as new as the CSV.
+    """
+    csv_path = artifact_path(name, "csv")
+    parquet_path = artifact_path(name, "parquet")
+
+    if parquet_available() and os.path.exists(parquet_path):
+        if (
+            not os.path.exists(csv_path)
+            or os.path.getmtime(parquet_path) >= os.path.getmtime(csv_path)
+        ):
+            return parquet_path, "parquet"
+
+    if not os.path.exists(csv_path):
         raise FileNotFoundError(
-            f"Cleaned file not found: {cleaned_path}. "
+            f"Cleaned file not found: {csv_path}. "
             f"Run data cleaning first."
         )
 
-    return pd.read_csv(cleaned_path)
+    return csv_path, "csv"
+
+
+def artifact_mtime(name: str):
+    """
+    Modification time of the artifact that would be read, or None.
+    """
+    try:
+        path, _ = _resolve_source(name)
+    except FileNotFoundError:
+        return None
+    return os.path.getmtime(path)
+
+
+def _parquet_columns(path: str) -> list:
+    """Column names of a Parquet file or partitioned dataset directory"""
+    if os.path.isdir(path):
+        return pads.dataset(path, format="parquet").schema.names
+    return pq.read_schema(path).names
+
+
+def _read_file(path: str, fmt: str, columns=None) -> pd.DataFrame:
+    if fmt == "parquet":
+        if columns is not None:
+            available = _parquet_columns(path)
+            columns = [c for c in columns if c in available]
+        table = pq.read_table(path, columns=columns, memory_map=True)
+        return table.to_pandas()
+
+    if columns is not None:
+        available = pd.read_csv(path, nrows=0).columns
+        columns = [c for c in columns if c in available]
+    return pd.read_csv(path, usecols=columns)
+
+
+def load_artifact(name: str, columns=None) -> pd.DataFrame:
+    """
+    Loads a table from backend/data/cleaned/<name>.parquet|csv through
+    the shared cache.
+
+    - columns: optional subset to read (missing names are ignored)
+
+    Frames are cached per process and re-read only when the file's
+    mtime or size changes. The returned frame is shared between
+    callers and must be treated as read-only.
+    """
+    path, fmt = _resolve_source(name)
+    signature = (path,) + _file_signature(path)
+    key = (name, tuple(columns) if columns is not None else None)
+
+    with _cache_lock:
+        entry = _dataset_cache.get(key)
+        if entry is not None and entry[0] == signature:
+            _dataset_cache.move_to_end(key)
+            return entry[1]
+
+        # A cached full frame can serve any column subset
+        full = _dataset_cache.get((name, None))
+        if columns is not None and full is not None and full[0] == signature:
+            _dataset_cache.move_to_end((name, None))
+            return full[1][[c for c in columns if c in full[1].columns]]
+
+    # Parse outside the lock so other datasets stay available meanwhile
+    df = optimize_dtypes(_read_file(path, fmt, columns))
+    nbytes = int(df.memory_usage(deep=True).sum())
+
+    with _cache_lock:
+        _dataset_cache[key] = (signature, df, nbytes)
+        _dataset_cache.move_to_end(key)
+        _evict_over_budget()
+
+    return df
+
+
+def load_clean_csv(dataset_name: str, columns=None) -> pd.DataFrame:
+    """
+    Loads a cleaned dataset from backend/data/cleaned/
+    Example: enrolment_clean.parquet, falling back to enrolment_clean.csv
+
+    - columns: optional subset to read (missing names are ignored)
+    """
+    return load_artifact(f"{dataset_name}_clean", columns=columns)
+
+
+def load_clean_rows_where(dataset_name: str, columns, column: str, value) -> pd.DataFrame:
+    """
+    Reads `columns` of the cleaned rows where `column` == `value`,
+    without going through the cache or materialising the full dataset:
+    Parquet applies the predicate while scanning, the CSV fallback is
+    filtered chunk by chunk.
+
+    - columns: must include `column` (missing names are ignored)
+    """
+    path, fmt = _resolve_source(f"{dataset_name}_clean")
+
+    if fmt == "parquet":
+        available = _parquet_columns(path)
+    else:
+        available = pd.read_csv(path, nrows=0).columns
+    columns = [c for c in columns if c in available]
+
+    if column not in columns:
+        return pd.DataFrame(columns=columns)
+
+    if fmt == "parquet":
+        table = pq.read_table(
+            path,
+            columns=columns,
+            filters=[(column, "==", value)],
+            memory_map=True
+        )
+        return table.to_pandas()
+
+    parts = []
+    with pd.read_csv(path, usecols=columns, dtype=str, chunksize=FILTERED_READ_CHUNK_ROWS) as reader:
+        for chunk in reader:
+            parts.append(chunk[chunk[column] == value])
+    return pd.concat(parts, ignore_index=True)
@@ -0,0 +1,151 @@
+import os
+import csv
+import json
+import threading
+import pandas as pd
+
+from app.services.data_loader import (
+    BASE_DATA_PATH,
+    list_csv_files
+)
+
+# Per-file header and row count, keyed by path and invalidated by
+# mtime/size, so inspecting a raw dataset never parses its rows.
+CATALOG_FILE = os.path.join(BASE_DATA_PATH, "cleaned", "raw_catalog.json")
+
+COUNT_BLOCK_BYTES = 1024 * 1024
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+# -----------------------------
+# FILE METADATA
+# -----------------------------
+
+def _read_header(path: str) -> list:
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        return next(csv.reader(f), [])
+
+
+def _count_data_rows(path: str) -> int:
+    """
+    Counts newline-terminated records without parsing them
+    (the raw API slices never quote embedded newlines).
+    """
+    lines = 0
+    last = b"\n"
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(COUNT_BLOCK_BYTES)
+            if not block:
+                break
+            lines += block.count(b"\n")
+            last = block[-1:]
+
+    # Last record without a trailing newline
+    if last != b"\n":
+        lines += 1
+
+    return max(lines - 1, 0)
+
+
+def _load_catalog() -> dict:
+    try:
+        with open(CATALOG_FILE, "r") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def _save_catalog(catalog: dict):
+    tmp_file = f"{CATALOG_FILE}.tmp"
+    with open(tmp_file, "w") as f:
+        json.dump(catalog, f, indent=2)
+    os.replace(tmp_file, CATALOG_FILE)
+
+
+def _file_entries(dataset_name: str) -> list:
+    global _catalog
+
+    csv_files = list_csv_files(dataset_name)
+
+    with _catalog_lock:
+        if _catalog is None:
+            _catalog = _load_catalog()
+
+        entries = []
+        changed = False
+        for path in csv_files:
+            stat = os.stat(path)
+            key = os.path.relpath(path, BASE_DATA_PATH)
+            entry = _catalog.get(key)
+
+            if (
+                entry is None
+                or entry["mtime_ns"] != stat.st_mtime_ns
+                or entry["size"] != stat.st_size
+            ):
+                entry = {
+                    "mtime_ns": stat.st_mtime_ns,
+                    "size": stat.st_size,
+                    "columns": _read_header(path),
+                    "rows": _count_data_rows(path)
+                }
+                _catalog[key] = entry
+                changed = True
+
+            entries.append((path, entry))
+
+        if changed:
+            os.makedirs(os.path.dirname(CATALOG_FILE), exist_ok=True)
+            _save_catalog(_catalog)
+
+        return entries
+
+
+# -----------------------------
+# DATASET QUERIES
+# -----------------------------
+
+def dataset_summary(dataset_name: str) -> dict:
+    """
+    Columns (in first-seen order across files), total rows and
+    file count for a raw dataset folder.
+    """
+    entries = _file_entries(dataset_name)
+
+    columns = []
+    for _, entry in entries:
+        columns.extend(c for c in entry["columns"] if c not in columns)
+
+    return {
+        "columns": columns,
+        "total_rows": sum(entry["rows"] for _, entry in entries),
+        "files": len(entries)
+    }
+
+
+def sample_rows(dataset_name: str, limit: int = 5) -> pd.DataFrame:
+    """
+    First `limit` rows of a raw dataset, reading only as many
+    leading files (and rows) as needed. Column types are inferred, as
+    /data/sample always did (pincodes and counts come back as numbers).
+    """
+    limit = max(limit, 0)
+    frames = []
+    remaining = limit
+
+    for path, entry in _file_entries(dataset_name):
+        if remaining <= 0:
+            break
+        if entry["rows"] == 0:
+            continue
+        frame = pd.read_csv(path, nrows=remaining)
+        frames.append(frame)
+        remaining -= len(frame)
+
+    if not frames:
+        return pd.DataFrame(columns=dataset_summary(dataset_name)["columns"])
+
+    return pd.concat(frames, ignore_index=True)
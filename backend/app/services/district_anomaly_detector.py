@@ -1,14 +1,91 @@
 import difflib
-import os
-import pandas as pd
+import heapq
+from collections import Counter, defaultdict
 from typing import List, Dict
+from app.services.data_loader import load_clean_rows_where, artifact_mtime
+from app.services.aggregate_cube import district_counts_fresh, load_district_counts
+
+DATASETS = ["enrolment", "biometric_update", "demographic_update"]
+
+# Character n-gram size of the candidate index
+NGRAM_SIZE = 2
+
+# Close matches kept per district (as difflib.get_close_matches(n=5))
+MAX_MATCHES = 5
+
 
 # -----------------------------
-# Paths
+# Helper: candidate generation
 # -----------------------------
+# A pair can only reach SequenceMatcher.ratio() >= cutoff if
+# - 2 * min(la, lb) / (la + lb) >= cutoff (length bound), and
+# - it shares at least max(la, lb) - q + 1 - q * d q-grams, where
+#   d = floor((1 - cutoff) * (la + lb)) bounds the insertions/deletions
+#   between the two names (q-gram count filter).
+# Both bounds are exact, so pruning never drops a pair difflib would
+# have matched; only survivors are scored with SequenceMatcher.
+
+def _ngrams(name: str) -> Counter:
+    return Counter(name[i:i + NGRAM_SIZE] for i in range(len(name) - NGRAM_SIZE + 1))
+
+
+def _max_edits(la: int, lb: int, cutoff: float) -> int:
+    return int((1 - cutoff) * (la + lb) + 1e-9)
+
+
+def _min_shared_ngrams(la: int, lb: int, cutoff: float) -> int:
+    return max(la, lb) - NGRAM_SIZE + 1 - NGRAM_SIZE * _max_edits(la, lb, cutoff)
+
+
+def _length_compatible(la: int, lb: int, cutoff: float) -> bool:
+    return la + lb > 0 and 2 * min(la, lb) / (la + lb) >= cutoff - 1e-9
+
+
+def _candidates(names: List[str], cutoff: float) -> Dict[int, List[int]]:
+    """
+    Maps i to the sorted j > i whose pair (names[i], names[j]) survives
+    the length bound and the q-gram count filter.
 
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-CLEANED_DATA_DIR = os.path.join(BASE_DIR, "data", "cleaned")
+    Names are indexed from the end backwards, so the index only ever
+    holds names after i; postings are keyed by (gram, length) so only
+    length-compatible names are visited.
+    """
+    by_length = defaultdict(list)
+    postings = defaultdict(list)
+    candidates = {}
+
+    for i in range(len(names) - 1, -1, -1):
+        name = names[i]
+        la = len(name)
+        grams = _ngrams(name)
+
+        needed = {
+            lb: _min_shared_ngrams(la, lb, cutoff)
+            for lb in by_length
+            if _length_compatible(la, lb, cutoff)
+        }
+
+        found = set()
+        for lb, threshold in needed.items():
+            if threshold <= 0:
+                # Too short for the count filter to say anything
+                found.update(by_length[lb])
+                continue
+
+            shared = Counter()
+            for gram, count in grams.items():
+                for j, other in postings.get((gram, lb), ()):
+                    shared[j] += min(count, other)
+            found.update(j for j, total in shared.items() if total >= threshold)
+
+        if found:
+            candidates[i] = sorted(found)
+
+        by_length[la].append(i)
+        for gram, count in grams.items():
+            postings[(gram, la)].append((i, count))
+
+    return candidates
 
 
 # -----------------------------
@@ -19,20 +96,29 @@ def _pairwise_similarities(names: List[str], cutoff: float) -> List[Dict]:
     """
     Compute near-duplicate pairs among a list of names using difflib.
     Operates on UNIQUE district names only (fast).
+
+    Same pairs as get_close_matches(name, names[i + 1:], n=5) per name,
+    but only candidates from the n-gram index are scored.
     """
     results = []
-    n = len(names)
+    matcher = difflib.SequenceMatcher()
 
-    for i in range(n):
+    for i, candidates in sorted(_candidates(names, cutoff).items()):
         a = names[i]
-        matches = difflib.get_close_matches(
-            a,
-            names[i + 1 :],
-            n=5,
-            cutoff=cutoff
-        )
-
-        for b in matches:
+        matcher.set_seq2(a)
+
+        scored = []
+        for j in candidates:
+            b = names[j]
+            matcher.set_seq1(b)
+            if (
+                matcher.real_quick_ratio() >= cutoff
+                and matcher.quick_ratio() >= cutoff
+                and matcher.ratio() >= cutoff
+            ):
+                scored.append((matcher.ratio(), b))
+
+        for _, b in heapq.nlargest(MAX_MATCHES, scored):
             score = difflib.SequenceMatcher(None, a, b).ratio()
             results.append({
                 "district_a": a,
@@ -43,6 +129,51 @@ def _pairwise_similarities(names: List[str], cutoff: float) -> List[Dict]:
     return results
 
 
+def _enrich_pairs(pairs: List[Dict], counts: Dict, min_count_ratio: float) -> List[Dict]:
+    enriched = []
+    for p in pairs:
+        a = p["district_a"]
+        b = p["district_b"]
+
+        ca = counts.get(a, 0)
+        cb = counts.get(b, 0)
+
+        ratio = max(ca, cb) / max(1, min(ca, cb))
+
+        enriched.append({
+            **p,
+            "rows_a": ca,
+            "rows_b": cb,
+            "count_ratio": round(ratio, 2),
+            "recommendation": "review" if ratio >= min_count_ratio else "check"
+        })
+
+    return enriched
+
+
+# -----------------------------
+# Helper: district row counts
+# -----------------------------
+
+def _state_district_counts(dataset: str, state: str) -> Dict[str, int]:
+    """
+    Rows per district of one state, from the (state, district) counts
+    built at cleaning time; if those are older than the cleaned data,
+    only the state's rows (two columns) are read instead.
+    """
+    if district_counts_fresh(dataset):
+        table = load_district_counts(dataset)
+        table = table[table["state"] == state]
+        pairs = zip(table["district"], table["rows"])
+    else:
+        df = load_clean_rows_where(dataset, ["state", "district"], "state", state)
+        if "district" not in df.columns:
+            return {}
+        pairs = df["district"].value_counts().items()
+
+    return {str(district): int(rows) for district, rows in pairs if rows > 0}
+
+
 # -----------------------------
 # Main detector
 # -----------------------------
@@ -62,47 +193,18 @@ def detect_district_anomalies(
     """
 
     # -----------------------------
-    # Load CLEANED CSV (NOT folder)
+    # Frequency per district in this state
     # -----------------------------
 
-    cleaned_file = os.path.join(
-        CLEANED_DATA_DIR,
-        f"{dataset}_clean.csv"
-    )
-
-    if not os.path.exists(cleaned_file):
-        raise FileNotFoundError(
-            f"Cleaned file not found: {cleaned_file}. "
-            f"Run data cleaning first."
-        )
-
-    df = pd.read_csv(cleaned_file)
+    counts = _state_district_counts(dataset, state)
 
-    # -----------------------------
-    # Scope to state
-    # -----------------------------
-
-    if "state" not in df.columns or "district" not in df.columns:
-        return {
-            "state": state,
-            "dataset": dataset,
-            "potential_duplicates": []
-        }
-
-    df = df[df["state"] == state]
-
-    if df.empty:
+    if not counts:
         return {
             "state": state,
             "dataset": dataset,
             "potential_duplicates": []
         }
 
-    # -----------------------------
-    # Frequency per district
-    # -----------------------------
-
-    counts = df["district"].value_counts().to_dict()
     districts = sorted(counts.keys())
 
     # -----------------------------
@@ -110,24 +212,7 @@ def detect_district_anomalies(
     # -----------------------------
 
     pairs = _pairwise_similarities(districts, similarity_cutoff)
-
-    enriched = []
-    for p in pairs:
-        a = p["district_a"]
-        b = p["district_b"]
-
-        ca = counts.get(a, 0)
-        cb = counts.get(b, 0)
-
-        ratio = max(ca, cb) / max(1, min(ca, cb))
-
-        enriched.append({
-            **p,
-            "rows_a": ca,
-            "rows_b": cb,
-            "count_ratio": round(ratio, 2),
-            "recommendation": "review" if ratio >= min_count_ratio else "check"
-        })
+    enriched = _enrich_pairs(pairs, counts, min_count_ratio)
 
     # -----------------------------
     # Final response
@@ -140,3 +225,59 @@ def detect_district_anomalies(
         "min_count_ratio": min_count_ratio,
         "potential_duplicates": enriched
     }
+
+
+# -----------------------------
+# National scan
+# -----------------------------
+
+def detect_national_district_anomalies(
+    datasets: List[str] = None,
+    similarity_cutoff: float = 0.9,
+    min_count_ratio: float = 5.0
+):
+    """
+    Runs the near-duplicate check for every state of each dataset in
+    one pass (district names are only compared within their state).
+
+    - datasets: subset of enrolment | biometric_update | demographic_update
+      (default: all three)
+
+    Datasets that have not been cleaned yet are skipped and listed under
+    "skipped_datasets".
+    """
+    results = []
+    skipped = []
+
+    for dataset in datasets or DATASETS:
+        if artifact_mtime(f"{dataset}_clean") is None:
+            skipped.append(dataset)
+            continue
+
+        table = load_district_counts(dataset)
+
+        duplicates = []
+        for state, group in table.groupby("state", observed=True):
+            counts = {
+                str(district): int(rows)
+                for district, rows in zip(group["district"], group["rows"])
+                if rows > 0
+            }
+            pairs = _pairwise_similarities(sorted(counts), similarity_cutoff)
+            duplicates.extend(
+                {"state": state, **p}
+                for p in _enrich_pairs(pairs, counts, min_count_ratio)
+            )
+
+        results.append({
+            "dataset": dataset,
+            "states_scanned": int(table["state"].nunique()),
+            "potential_duplicates": duplicates
+        })
+
+    return {
+        "similarity_cutoff": similarity_cutoff,
+        "min_count_ratio": min_count_ratio,
+        "datasets": results,
+        "skipped_datasets": skipped
+    }
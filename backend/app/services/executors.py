@@ -0,0 +1,50 @@
+import os
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Blocking work is grouped into workload classes, each with its own
+# bounded pool, so a burst of one kind (e.g. model fits) cannot starve
+# the others or the event loop:
+# - forecast:  Prophet / ARIMA / Holt-Winters fits (CPU heavy, slow)
+# - aggregate: pandas work over cleaned datasets (aggregates, cleaning)
+# - db:        short SQLAlchemy queries
+WORKLOAD_LIMITS = {
+    "forecast": int(os.getenv("FORECAST_CONCURRENCY", 2)),
+    "aggregate": int(os.getenv("AGGREGATE_CONCURRENCY", 4)),
+    "db": int(os.getenv("DB_CONCURRENCY", 8)),
+}
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def get_executor(workload: str) -> ThreadPoolExecutor:
+    with _executors_lock:
+        if workload not in _executors:
+            _executors[workload] = ThreadPoolExecutor(
+                max_workers=WORKLOAD_LIMITS[workload],
+                thread_name_prefix=f"{workload}-worker"
+            )
+        return _executors[workload]
+
+
+async def run_in(workload: str, func, *args, **kwargs):
+    """
+    Runs a blocking call on the workload's pool and awaits its result
+    without blocking the event loop. Exceptions (including
+    HTTPException) propagate to the caller.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_executor(workload),
+        functools.partial(func, *args, **kwargs)
+    )
+
+
+def shutdown_executors():
+    with _executors_lock:
+        for executor in _executors.values():
+            executor.shutdown(wait=False, cancel_futures=True)
+        _executors.clear()
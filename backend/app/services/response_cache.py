@@ -0,0 +1,111 @@
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.services.data_loader import BASE_DATA_PATH
+
+# Responses of deterministic endpoints, tagged with the dataset version
+# (a fingerprint of the cleaning log, which every clean_dataset run
+# rewrites). A new version makes every entry and ETag stale.
+CLEANING_LOG = os.path.join(BASE_DATA_PATH, "cleaned", "cleaning_log.json")
+
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", 256))
+RESPONSE_CACHE_MAX_AGE = int(os.getenv("RESPONSE_CACHE_MAX_AGE", 0))
+
+# (path, query) -> (dataset_version, etag, body bytes)
+_responses = OrderedDict()
+_responses_lock = threading.Lock()
+
+# (mtime_ns, size) of the cleaning log -> version, so the log is only
+# re-read when it changes
+_version_memo = {"signature": None, "version": None}
+
+
+def dataset_version() -> str:
+    try:
+        stat = os.stat(CLEANING_LOG)
+    except FileNotFoundError:
+        return "no-data"
+
+    signature = (stat.st_mtime_ns, stat.st_size)
+    with _responses_lock:
+        if _version_memo["signature"] == signature:
+            return _version_memo["version"]
+
+    with open(CLEANING_LOG, "rb") as f:
+        version = hashlib.sha1(f.read()).hexdigest()[:16]
+
+    with _responses_lock:
+        _version_memo.update(signature=signature, version=version)
+    return version
+
+
+def clear_response_cache():
+    with _responses_lock:
+        _responses.clear()
+        _version_memo.update(signature=None, version=None)
+
+
+def _cache_key(request: Request):
+    return request.url.path, tuple(sorted(request.query_params.multi_items()))
+
+
+def _etag(version: str, key) -> str:
+    digest = hashlib.sha1(json.dumps([version, key]).encode("utf-8")).hexdigest()[:20]
+    return f'"{digest}"'
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag in candidates
+
+
+async def cached_json(request: Request, compute) -> Response:
+    """
+    Serves a JSON endpoint through the response cache.
+
+    - compute: zero-argument coroutine function producing the payload,
+      only awaited on a cache miss
+
+    Sends a strong ETag and Cache-Control, and answers a matching
+    If-None-Match with 304 before any data is loaded.
+    """
+    version = dataset_version()
+    key = _cache_key(request)
+    etag = _etag(version, key)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={RESPONSE_CACHE_MAX_AGE}, must-revalidate"
+    }
+
+    if _matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    with _responses_lock:
+        entry = _responses.get(key)
+        if entry is not None and entry[0] == version:
+            _responses.move_to_end(key)
+            return Response(content=entry[2], media_type="application/json", headers=headers)
+
+    body = JSONResponse(content=jsonable_encoder(await compute())).body
+
+    # Don't store a result computed against data that changed meanwhile
+    if dataset_version() == version:
+        with _responses_lock:
+            _responses[key] = (version, etag, body)
+            _responses.move_to_end(key)
+            while len(_responses) > RESPONSE_CACHE_MAX_ENTRIES:
+                _responses.popitem(last=False)
+
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -1,14 +1,34 @@
 import pandas as pd
 
+
+def parse_dates(values: pd.Series) -> pd.Series:
+    """
+    Parses UIDAI dates (DD-MM-YYYY); unparseable values become NaT.
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        # Parse each distinct date once, then expand through the codes
+        categories = pd.to_datetime(values.cat.categories, dayfirst=True, errors="coerce")
+        parsed = categories.take(
+            values.cat.codes.to_numpy(),
+            allow_fill=True,
+            fill_value=pd.NaT
+        )
+        return pd.Series(parsed, index=values.index, name=values.name)
+
+    return pd.to_datetime(values, dayfirst=True, errors="coerce")
+
+
 def get_time_span_days(df: pd.DataFrame) -> int:
     """
     Returns number of days covered by the dataframe.
     """
-    df = df.copy()
-    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    dates = parse_dates(df["date"])
 
-    min_date = df["date"].min()
-    max_date = df["date"].max()
+    min_date = dates.min()
+    max_date = dates.max()
 
     if pd.isna(min_date) or pd.isna(max_date):
         return 0
@@ -0,0 +1,85 @@
+"""
+Benchmark: cold vs warm reads of cleaned datasets, CSV vs Parquet.
+
+Run from backend/:
+    python benchmarks/bench_clean_formats.py [dataset ...]
+
+"cold" is the first read in the process (dataset cache empty),
+"warm" is a repeat read served from the in-memory cache.
+A missing Parquet artifact is generated from the CSV first.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+from app.services import data_loader
+
+DATASETS = ["enrolment", "biometric_update", "demographic_update"]
+COLUMN_SETS = {
+    "all columns": None,
+    "state+district": ["state", "district"],
+}
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def _ensure_parquet(dataset):
+    csv_path = data_loader.artifact_path(f"{dataset}_clean", "csv")
+    parquet_path = data_loader.artifact_path(f"{dataset}_clean", "parquet")
+    if not os.path.exists(parquet_path) and os.path.exists(csv_path):
+        print(f"  generating {os.path.basename(parquet_path)} from CSV")
+        data_loader.write_clean_parquet(dataset, pd.read_csv(csv_path))
+    return csv_path, parquet_path
+
+
+def _bench(dataset, fmt, path, columns):
+    def read():
+        return data_loader.load_clean_csv(dataset, columns=columns)
+
+    # Force the requested format by pointing the resolver at one file
+    original = data_loader._resolve_source
+    data_loader._resolve_source = lambda _name: (path, fmt)
+    try:
+        data_loader.clear_dataset_cache(dataset)
+        cold, df = _timed(read)
+        warm, _ = _timed(read)
+    finally:
+        data_loader._resolve_source = original
+
+    mem_mb = df.memory_usage(deep=True).sum() / (1024 ** 2)
+    return cold, warm, len(df), mem_mb
+
+
+def main(datasets):
+    if not data_loader.parquet_available():
+        print("pyarrow is not installed; only CSV can be benchmarked")
+
+    print(f"{'dataset':<20} {'format':<8} {'columns':<15} {'rows':>10} "
+          f"{'cold (s)':>10} {'warm (ms)':>10} {'mem (MB)':>9}")
+
+    for dataset in datasets:
+        csv_path, parquet_path = _ensure_parquet(dataset)
+        formats = [("csv", csv_path)]
+        if data_loader.parquet_available():
+            formats.append(("parquet", parquet_path))
+
+        for fmt, path in formats:
+            if not os.path.exists(path):
+                print(f"{dataset:<20} {fmt:<8} missing ({path})")
+                continue
+
+            for label, columns in COLUMN_SETS.items():
+                cold, warm, rows, mem_mb = _bench(dataset, fmt, path, columns)
+                print(f"{dataset:<20} {fmt:<8} {label:<15} {rows:>10} "
+                      f"{cold:>10.3f} {warm * 1000:>10.3f} {mem_mb:>9.1f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or DATASETS)
@@ -0,0 +1,101 @@
+"""
+Benchmark: peak RSS of clean_dataset, in-memory vs streaming mode.
+
+Run from backend/:
+    python benchmarks/bench_clean_memory.py [dataset] [--scale N ...] [--chunksize ROWS]
+
+The raw folder is copied N times into a scratch data directory for
+each scale so input size can grow without touching backend/data.
+Every run happens in a fresh subprocess; peak RSS is read from
+getrusage() of that process (Linux/macOS only).
+"""
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    return peak / (1024 ** 2) if sys.platform == "darwin" else peak / 1024
+
+
+def _prepare_scratch(dataset: str, scale: int) -> str:
+    source = os.path.join(BACKEND_DIR, "data", dataset)
+    scratch = tempfile.mkdtemp(prefix="bench_clean_")
+    target = os.path.join(scratch, dataset)
+    os.makedirs(target)
+    os.makedirs(os.path.join(scratch, "cleaned"))
+
+    for copy in range(scale):
+        for name in sorted(os.listdir(source)):
+            if name.endswith(".csv"):
+                shutil.copy(
+                    os.path.join(source, name),
+                    os.path.join(target, f"copy{copy:03d}_{name}")
+                )
+    return scratch
+
+
+def _child(dataset: str, scratch: str, streaming: bool, chunksize: int):
+    from app.services import data_loader, data_cleaner
+
+    # Redirect every path the pipeline writes to into the scratch dir
+    data_loader.BASE_DATA_PATH = scratch
+    data_cleaner.CLEAN_DATA_DIR = os.path.join(scratch, "cleaned")
+    data_cleaner.LOG_FILE = os.path.join(scratch, "cleaned", "cleaning_log.json")
+
+    baseline = _peak_rss_mb()
+    start = time.perf_counter()
+    result = data_cleaner.clean_dataset(dataset, streaming=streaming, chunksize=chunksize)
+    elapsed = time.perf_counter() - start
+
+    print(json.dumps({
+        "rows": result["rows"],
+        "seconds": elapsed,
+        "import_rss_mb": baseline,
+        "peak_rss_mb": _peak_rss_mb()
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("dataset", nargs="?", default="demographic_update")
+    parser.add_argument("--scale", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--chunksize", type=int, default=50000)
+    parser.add_argument("--child", nargs=2, metavar=("SCRATCH", "MODE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        scratch, mode = args.child
+        _child(args.dataset, scratch, mode == "streaming", args.chunksize)
+        return
+
+    print(f"{'scale':>5} {'mode':<10} {'rows':>10} {'seconds':>8} {'peak RSS (MB)':>14}")
+    for scale in args.scale:
+        scratch = _prepare_scratch(args.dataset, scale)
+        try:
+            for mode in ["in-memory", "streaming"]:
+                out = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), args.dataset,
+                     "--chunksize", str(args.chunksize), "--child", scratch, mode],
+                    cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+                )
+                stats = json.loads(out.stdout.strip().splitlines()[-1])
+                print(f"{scale:>5} {mode:<10} {stats['rows']:>10} "
+                      f"{stats['seconds']:>8.2f} {stats['peak_rss_mb']:>14.1f}")
+        finally:
+            shutil.rmtree(scratch, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+Benchmark: read-heavy /migration/* traffic, default vs tuned SQLite profile.
+
+Run from backend/ against a populated aadhaar_pulse.db:
+    python benchmarks/bench_db_reads.py [--requests N] [--concurrency N]
+
+Each profile runs in a fresh interpreter on its own copy of the
+database (journal mode is persistent), so the only difference is the
+connection profile from config.py:
+- default: rollback journal, synchronous=FULL, 2 MB page cache, no mmap
+  (SQLite's built-in defaults)
+- tuned:   the config.py defaults (WAL, synchronous=NORMAL, large page
+  cache, mmap, in-memory temp store)
+
+Requests go through the ASGI app in-process (httpx ASGITransport),
+cycling over state, district, trend, pincode and district-list
+endpoints for a sample of states and districts.
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROFILES = {
+    "default": {
+        "SQLITE_JOURNAL_MODE": "DELETE",
+        "SQLITE_SYNCHRONOUS": "FULL",
+        "SQLITE_CACHE_SIZE_KB": "2000",
+        "SQLITE_MMAP_SIZE": "0",
+        "SQLITE_TEMP_STORE": "DEFAULT",
+    },
+    "tuned": {},
+}
+
+
+def _urls(db, limit: int) -> list:
+    from models import MigrationPincodeDaily
+
+    rows = (
+        db.query(MigrationPincodeDaily.state, MigrationPincodeDaily.district, MigrationPincodeDaily.pincode)
+        .distinct()
+        .limit(limit)
+        .all()
+    )
+    urls = []
+    for state, district, pincode in rows:
+        urls += [
+            f"/migration/state/{state}",
+            f"/migration/district/{state}/{district}",
+            f"/migration/trend/{state}/{district}",
+            f"/migration/pincode/{pincode}",
+            f"/migration/districts/{state}",
+        ]
+    return urls
+
+
+async def _drive(requests: int, concurrency: int, sample: int) -> dict:
+    import httpx
+    from main import app
+    from database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        urls = _urls(db, sample)
+    finally:
+        db.close()
+    if not urls:
+        return {"error": "migration_pincode_daily is empty"}
+
+    latencies = []
+    queue = asyncio.Queue()
+    for i in range(requests):
+        queue.put_nowait(urls[i % len(urls)])
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for url in urls:  # warm up routes and connections
+            await client.get(url)
+
+        async def worker():
+            while not queue.empty():
+                url = queue.get_nowait()
+                started = time.perf_counter()
+                response = await client.get(url)
+                latencies.append(time.perf_counter() - started)
+                if response.status_code >= 500:
+                    raise RuntimeError(f"{url}: {response.status_code}")
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    ordered = sorted(latencies)
+    return {
+        "throughput": len(ordered) / elapsed,
+        "p50_ms": statistics.median(ordered) * 1000,
+        "p99_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000,
+    }
+
+
+def _run_profile(name: str, db_path: str, args) -> dict:
+    scratch = tempfile.mkdtemp(prefix=f"bench_db_reads_{name}_")
+    try:
+        db_copy = os.path.join(scratch, "aadhaar_pulse.db")
+        shutil.copyfile(db_path, db_copy)
+        env = {
+            **os.environ,
+            **PROFILES[name],
+            "DATABASE_URL": f"sqlite:///{db_copy}",
+            "FORECAST_SCHEDULER_ENABLED": "false",
+            "FORECAST_CACHE_PATH": os.path.join(scratch, "forecasts.db"),
+        }
+        completed = subprocess.run(
+            [
+                sys.executable, "-W", "ignore", os.path.abspath(__file__), "--worker",
+                "--requests", str(args.requests),
+                "--concurrency", str(args.concurrency),
+                "--sample", str(args.sample),
+            ],
+            cwd=BACKEND_DIR, env=env, capture_output=True, text=True
+        )
+        for line in completed.stdout.splitlines():
+            if line.startswith("RESULT "):
+                return json.loads(line[len("RESULT "):])
+        error = completed.stderr.strip().splitlines()
+        return {"error": error[-1] if error else f"exit code {completed.returncode}"}
+    finally:
+        shutil.rmtree(scratch)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", default=os.path.join(BACKEND_DIR, "aadhaar_pulse.db"))
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--sample", type=int, default=40, help="pincodes (and their districts) to cycle over")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        sys.path.insert(0, BACKEND_DIR)
+        result = asyncio.run(_drive(args.requests, args.concurrency, args.sample))
+        print("RESULT " + json.dumps(result))
+        return
+
+    if not os.path.exists(args.db):
+        print(f"{args.db} not found; run migration_etl.py first.")
+        return
+
+    print(f"{args.requests} requests, concurrency {args.concurrency}\n")
+    print(f"{'profile':<10} {'req/s':>8} {'p50':>10} {'p99':>10}")
+    for name in PROFILES:
+        result = _run_profile(name, args.db, args)
+        if "error" in result:
+            print(f"{name:<10} failed: {result['error']}")
+            continue
+        print(
+            f"{name:<10} {result['throughput']:>8.1f} "
+            f"{result['p50_ms']:>7.1f} ms {result['p99_ms']:>7.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark: database chunk restore time, raw vs compressed chunks.
+
+Run from backend/ with a built aadhaar_pulse.db:
+    python benchmarks/bench_db_restore.py [--chunk-mb N] [--workers N] [--repeat N]
+
+For every installed chunk format (none, zstd, lz4, gzip) the database
+is split into a scratch directory, then restored with one worker and
+with --workers workers. Reports the stored size and the median restore
+time. Use a --chunk-mb well below the database size to get several
+chunks to restore in parallel.
+"""
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import chunk_codecs  # noqa: E402
+import combine_chunks  # noqa: E402
+import split_database  # noqa: E402
+
+
+def _quietly(func, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args, **kwargs)
+
+
+def _restore_seconds(workers: int, repeat: int) -> float:
+    runs = []
+    for _ in range(repeat):
+        os.remove(combine_chunks.DB_FILE)
+        started = time.perf_counter()
+        if not _quietly(combine_chunks.combine_chunks, workers=workers):
+            raise RuntimeError("restore failed")
+        runs.append(time.perf_counter() - started)
+    return statistics.median(runs)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", default=os.path.join(BACKEND_DIR, "aadhaar_pulse.db"))
+    parser.add_argument("--chunk-mb", type=float, default=95)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"{args.db} not found; build the database first.")
+        return
+
+    split_database.CHUNK_SIZE = int(args.chunk_mb * 1024 * 1024)
+    db_mb = os.path.getsize(args.db) / 1024 ** 2
+    print(f"{os.path.basename(args.db)}: {db_mb:.1f} MB, {args.chunk_mb:g} MB chunks, {os.cpu_count()} CPUs\n")
+    print(f"{'format':<8} {'stored':>10} {'split':>8} {'restore x1':>11} {f'restore x{args.workers}':>11}")
+
+    scratch = tempfile.mkdtemp(prefix="bench_db_restore_")
+    cwd = os.getcwd()
+    try:
+        os.chdir(scratch)
+        shutil.copyfile(args.db, split_database.DB_FILE)
+
+        for codec in chunk_codecs.available_codecs():
+            started = time.perf_counter()
+            _quietly(split_database.split_database, codec, args.workers)
+            split_seconds = time.perf_counter() - started
+
+            stored = sum(
+                os.path.getsize(os.path.join(split_database.CHUNK_DIR, f))
+                for f in os.listdir(split_database.CHUNK_DIR)
+                if f != "manifest.json"
+            )
+            serial = _restore_seconds(1, args.repeat)
+            parallel = _restore_seconds(args.workers, args.repeat)
+
+            print(
+                f"{codec:<8} {stored / 1024 ** 2:>7.1f} MB {split_seconds:>7.2f}s "
+                f"{serial:>10.2f}s {parallel:>10.2f}s"
+            )
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(scratch)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Benchmark: latency of cheap endpoints while forecasts are running.
+
+Run from backend/ against populated migration index tables:
+    python benchmarks/bench_endpoint_latency.py [--state NAME] [--forecasts N] [--method prophet|arima|fast]
+
+Requests go through the ASGI app in-process (httpx ASGITransport), so
+any blocking call on the event loop shows up directly as latency.
+/migration/state/{state} is sampled on its own, then again while N
+forecast requests run concurrently; the forecast store is cleared
+before every forecast so each one really fits a model.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+os.chdir(BACKEND_DIR)
+os.environ.setdefault("FORECAST_SCHEDULER_ENABLED", "false")
+os.environ.setdefault("FORECAST_CACHE_PATH", os.path.join(tempfile.mkdtemp(), "bench_forecasts.db"))
+
+import httpx  # noqa: E402
+
+import forecast_cache  # noqa: E402
+from main import app  # noqa: E402
+from database import SessionLocal  # noqa: E402
+from forecasting import MigrationForecaster  # noqa: E402
+
+
+def _percentiles(samples: list) -> str:
+    ordered = sorted(samples)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    return (
+        f"n={len(samples):>4}  p50={statistics.median(ordered) * 1000:7.1f} ms  "
+        f"p99={p99 * 1000:7.1f} ms  max={ordered[-1] * 1000:7.1f} ms"
+    )
+
+
+async def _sample(client, url: str, stop: asyncio.Event, samples: list):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await client.get(url)
+        samples.append(time.perf_counter() - started)
+        await asyncio.sleep(0.01)
+
+
+async def _forecast_load(client, state: str, districts: list, method: str, count: int):
+    async def one(district):
+        forecast_cache.invalidate()
+        await client.get(f"/migration/forecast/{state}/{district}", params={"days": 30, "method": method})
+
+    await asyncio.gather(*(one(districts[i % len(districts)]) for i in range(count)))
+
+
+async def run(state: str, forecasts: int, method: str, baseline_seconds: float):
+    db = SessionLocal()
+    try:
+        districts = MigrationForecaster(db).get_districts_for_state(state)
+    finally:
+        db.close()
+    if not districts:
+        print(f"No districts for {state}; run migration_etl.py first.")
+        return
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        url = f"/migration/state/{state}"
+        await client.get(url)  # warm up
+
+        baseline, stop = [], asyncio.Event()
+        sampler = asyncio.create_task(_sample(client, url, stop, baseline))
+        await asyncio.sleep(baseline_seconds)
+        stop.set()
+        await sampler
+
+        loaded, stop = [], asyncio.Event()
+        sampler = asyncio.create_task(_sample(client, url, stop, loaded))
+        started = time.perf_counter()
+        await _forecast_load(client, state, districts, method, forecasts)
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await sampler
+
+    print(f"{url}")
+    print(f"  idle:                 {_percentiles(baseline)}")
+    print(f"  during {forecasts} {method} fits: {_percentiles(loaded)}")
+    print(f"  forecasts finished in {elapsed:.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--state", default="Karnataka")
+    parser.add_argument("--forecasts", type=int, default=8)
+    parser.add_argument("--method", default="prophet", choices=["prophet", "arima", "fast"])
+    parser.add_argument("--baseline-seconds", type=float, default=2.0)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.state, args.forecasts, args.method, args.baseline_seconds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Benchmark: batched NumPy Holt-Winters ("fast") vs Prophet.
+
+Run from backend/ against populated migration index tables:
+    python benchmarks/bench_fast_forecast.py [--state NAME] [--holdout DAYS] [--prophet-limit N]
+
+The last `holdout` days of every district's history are held out. Each
+engine is fitted on the remainder and scored on the held-out days:
+MAE, RMSE and the share of actuals inside the 95% interval. A naive
+baseline (mean of the last 7 training points) is included for scale.
+Prophet is skipped when it is not installed.
+"""
+import argparse
+import importlib.util
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+os.chdir(BACKEND_DIR)
+
+from database import SessionLocal  # noqa: E402
+from models import MigrationDistrictDaily  # noqa: E402
+from forecasting import MigrationForecaster  # noqa: E402
+import fast_forecast  # noqa: E402
+
+
+def _load_histories(state=None) -> dict:
+    db = SessionLocal()
+    try:
+        forecaster = MigrationForecaster(db)
+        states = [state] if state else [
+            s for (s,) in db.query(MigrationDistrictDaily.state).distinct()
+        ]
+        histories = {}
+        for name in states:
+            for district, df in forecaster.get_state_historical_data(name).items():
+                histories[(name, district)] = df
+        return histories
+    finally:
+        db.close()
+
+
+def _split(histories: dict, holdout: int):
+    train, test = {}, {}
+    for key, df in histories.items():
+        if df is None:
+            continue
+        dates = pd.to_datetime(df["date"])
+        cutoff = dates.max() - pd.Timedelta(days=holdout)
+        history = df[dates <= cutoff]
+        actual = df[dates > cutoff]
+        if len(history) >= fast_forecast.MIN_OBSERVATIONS and len(actual):
+            train[key] = history.reset_index(drop=True)
+            test[key] = actual.assign(date=pd.to_datetime(actual["date"]))
+    return train, test
+
+
+def _score(name, forecasts: dict, test: dict, seconds: float):
+    errors, covered, total = [], 0, 0
+    for key, actual in test.items():
+        forecast = forecasts.get(key)
+        if forecast is None:
+            continue
+        merged = actual.merge(forecast, on="date", how="inner")
+        errors.append(merged["migration_index"] - merged["predicted_index"])
+        inside = (
+            (merged["migration_index"] >= merged["lower_bound"])
+            & (merged["migration_index"] <= merged["upper_bound"])
+        )
+        covered += int(inside.sum())
+        total += len(merged)
+
+    if not errors:
+        print(f"{name:<10} no forecasts")
+        return
+
+    errors = pd.concat(errors)
+    print(
+        f"{name:<10} districts={len(forecasts):>4}  "
+        f"MAE={errors.abs().mean():.4f}  RMSE={np.sqrt((errors ** 2).mean()):.4f}  "
+        f"coverage95={covered / total:.1%}  time={seconds:.2f}s"
+    )
+
+
+def _naive(train: dict, horizon: int) -> dict:
+    forecasts = {}
+    for key, df in train.items():
+        last = pd.to_datetime(df["date"]).max()
+        level = df["migration_index"].tail(7).mean()
+        spread = 1.96 * df["migration_index"].tail(7).std(ddof=0)
+        forecasts[key] = pd.DataFrame({
+            "date": pd.date_range(last + pd.Timedelta(days=1), periods=horizon),
+            "predicted_index": level,
+            "lower_bound": max(level - spread, 0),
+            "upper_bound": level + spread
+        })
+    return forecasts
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--state", help="limit to one state (default: all)")
+    parser.add_argument("--holdout", type=int, default=7, help="held-out days per district")
+    parser.add_argument("--prophet-limit", type=int, default=50,
+                        help="max districts to fit with Prophet (it is slow)")
+    args = parser.parse_args()
+
+    train, test = _split(_load_histories(args.state), args.holdout)
+    if not train:
+        print("No district has enough history; run migration_etl.py first.")
+        return
+    horizon = args.holdout + 7  # room for gaps between last train and test dates
+    print(f"{len(train)} districts, holdout {args.holdout} days\n")
+
+    started = time.perf_counter()
+    _score("naive", _naive(train, horizon), test, time.perf_counter() - started)
+
+    started = time.perf_counter()
+    fast = fast_forecast.forecast_batch(train, horizon)
+    _score("fast", fast, test, time.perf_counter() - started)
+
+    if importlib.util.find_spec("prophet") is None:
+        print("prophet     not installed, skipped")
+        return
+
+    forecaster = MigrationForecaster(None)
+    subset = list(train)[:args.prophet_limit]
+    started = time.perf_counter()
+    prophet_forecasts = {}
+    for key in subset:
+        try:
+            prophet_forecasts[key] = forecaster.forecast_prophet(train[key], horizon)
+        except Exception as e:
+            print(f"  prophet failed for {key}: {e}")
+    elapsed = time.perf_counter() - started
+    _score("prophet", prophet_forecasts, {k: test[k] for k in subset}, elapsed)
+    _score("fast", {k: fast[k] for k in subset}, {k: test[k] for k in subset}, 0.0)
+    print(f"\n(prophet scored on the first {len(subset)} districts; fast re-scored on the same set)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark: API cold start (import time and RSS) and first-forecast cost.
+
+Run from backend/:
+    python benchmarks/bench_startup.py [--repeat N]
+
+Each measurement runs in a fresh interpreter, the way an autoscaled
+worker starts. For both apps (main: full API, app.main: slim API) it
+reports the wall time to import the ASGI app, the RSS afterwards and
+whether prophet / statsmodels were imported. It then times loading
+each registered forecast engine on first use.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_PROBE = r"""
+import json, resource, sys, time
+started = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - started
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+peak_mb = peak / (1024 ** 2) if sys.platform == "darwin" else peak / 1024
+heavy = sorted(m for m in ("prophet", "statsmodels") if m in sys.modules)
+print("RESULT " + json.dumps({{"seconds": elapsed, "rss_mb": peak_mb, "heavy": heavy}}))
+"""
+
+
+def _probe(statement: str) -> dict:
+    completed = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", _PROBE.format(statement=statement)],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True
+    )
+    for line in completed.stdout.splitlines():
+        if line.startswith("RESULT "):
+            return json.loads(line[len("RESULT "):])
+    error = completed.stderr.strip().splitlines()
+    return {"error": error[-1] if error else f"exit code {completed.returncode}"}
+
+
+def _report(label: str, statement: str, repeat: int):
+    runs = [_probe(statement) for _ in range(repeat)]
+    failed = [r for r in runs if "error" in r]
+    if failed:
+        print(f"{label:<28} failed: {failed[0]['error']}")
+        return
+
+    seconds = statistics.median(r["seconds"] for r in runs)
+    rss = statistics.median(r["rss_mb"] for r in runs)
+    heavy = ", ".join(runs[-1]["heavy"]) or "-"
+    print(f"{label:<28} {seconds:7.2f}s  {rss:7.1f} MB  heavy modules: {heavy}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=3, help="fresh processes per measurement")
+    args = parser.parse_args()
+
+    print(f"{'import':<28} {'median':>8}  {'RSS':>10}")
+    _report("app.main (slim API)", "import app.main", args.repeat)
+    _report("main (full API)", "import main", args.repeat)
+
+    print("\nfirst use of each forecast engine (after importing forecasting):")
+    for engine in ("prophet", "arima"):
+        _report(
+            f"get_engine('{engine}')",
+            f"import forecasting\nstarted = time.perf_counter()\nforecasting.get_engine('{engine}')",
+            args.repeat
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Compression formats for database chunks (split_database.py / combine_chunks.py).
+
+Each chunk is a single independent frame, so chunks can be written and
+restored in parallel. zstd and lz4 are used when their packages
+(zstandard, lz4) are installed; gzip is always available.
+"""
+
+import gzip
+
+try:
+    import zstandard
+except ImportError:  # optional
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:  # optional
+    lz4_frame = None
+
+# codec -> chunk file suffix
+CODEC_SUFFIXES = {"none": "", "zstd": ".zst", "lz4": ".lz4", "gzip": ".gz"}
+
+# Preference order for compression="auto"
+AUTO_ORDER = ["zstd", "lz4", "gzip"]
+
+ZSTD_LEVEL = 10
+GZIP_LEVEL = 6
+
+def available_codecs():
+    installed = {"none": True, "zstd": zstandard is not None, "lz4": lz4_frame is not None, "gzip": True}
+    return [codec for codec in CODEC_SUFFIXES if installed[codec]]
+
+def resolve_codec(name):
+    """Maps none/auto/None or a codec name to an installed codec"""
+    if name in (None, "none"):
+        return "none"
+
+    available = available_codecs()
+    if name == "auto":
+        return next(codec for codec in AUTO_ORDER if codec in available)
+
+    if name not in available:
+        raise ValueError(f"Compression '{name}' is not available (installed: {', '.join(available)})")
+    return name
+
+def open_writer(path, codec):
+    """Binary file object that stores what is written to it as one frame"""
+    if codec == "none":
+        return open(path, 'wb')
+    if codec == "gzip":
+        return gzip.open(path, 'wb', compresslevel=GZIP_LEVEL)
+    if codec == "lz4":
+        return lz4_frame.open(path, 'wb')
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).stream_writer(open(path, 'wb'), closefd=True)
+    raise ValueError(f"Unknown compression '{codec}'")
+
+def open_reader(path, codec):
+    """Binary file object yielding the decompressed chunk (supports readinto)"""
+    if codec == "none":
+        return open(path, 'rb')
+    if codec == "gzip":
+        return gzip.open(path, 'rb')
+    if codec == "lz4":
+        return lz4_frame.open(path, 'rb')
+    if codec == "zstd":
+        return zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+    raise ValueError(f"Unknown compression '{codec}'")
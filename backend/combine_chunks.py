@@ -1,46 +1,242 @@
 """
 Automatically combine database chunks on startup.
 This runs before the app starts.
+
+Chunks are restored in parallel, each streamed through a fixed-size
+buffer (and decompressed, see chunk_codecs.py) straight to its offset in
+a preallocated temp file. The temp file replaces the database only after
+every chunk matched db_chunks/manifest.json, so a crash mid-copy never
+leaves a truncated database in place. Only a database shorter than its
+own SQLite header says is rebuilt automatically; any other existing
+database is kept (and, when it matches the manifest, marked verified).
 """
 
 import os
+import re
 import glob
+import json
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+from chunk_codecs import open_reader
 
 CHUNK_DIR = "db_chunks"
 DB_FILE = "aadhaar_pulse.db"
+MANIFEST_FILE = os.path.join(CHUNK_DIR, "manifest.json")
+COPY_BUFFER_SIZE = 1024 * 1024  # bytes held in memory at a time, per worker
+RESTORE_WORKERS = int(os.getenv("DB_CHUNK_WORKERS", min(4, os.cpu_count() or 1)))
+
+# Written after a successful combine/verification; names the manifest the
+# database was built from and the file's inode. The app may modify the
+# database in place afterwards, but a replaced file must be re-verified.
+VERIFIED_MARKER = f"{DB_FILE}.verified"
+
+def load_manifest(chunk_files):
+    """
+    Chunk list with offsets, sizes and hashes. Chunks split before
+    manifests existed only get sizes (no hashes to verify against).
+    """
+    if os.path.exists(MANIFEST_FILE):
+        with open(MANIFEST_FILE, 'r') as f:
+            return json.load(f)
+
+    chunks = []
+    offset = 0
+    for chunk_file in chunk_files:
+        if not re.search(r"\.chunk\d+$", chunk_file):
+            raise ValueError(f"{os.path.basename(chunk_file)} needs {MANIFEST_FILE} to be restored")
+        size = os.path.getsize(chunk_file)
+        chunks.append({
+            "file": os.path.basename(chunk_file),
+            "offset": offset,
+            "size": size,
+            "sha256": None
+        })
+        offset += size
+
+    return {"db_file": DB_FILE, "size": offset, "sha256": None, "chunks": chunks}
+
+def _manifest_id(manifest):
+    return hashlib.sha256(json.dumps(manifest, sort_keys=True).encode("utf-8")).hexdigest()
+
+def _file_sha256(path):
+    buffer = bytearray(COPY_BUFFER_SIZE)
+    view = memoryview(buffer)
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while n := f.readinto(buffer):
+            digest.update(view[:n])
+    return digest.hexdigest()
+
+def _sqlite_truncated(path):
+    """
+    Whether the file is shorter than the page count in its SQLite header
+    (or is not an SQLite database at all).
+    """
+    with open(path, 'rb') as f:
+        header = f.read(100)
+    if len(header) < 100 or not header.startswith(b"SQLite format 3\x00"):
+        return True
+
+    page_size = int.from_bytes(header[16:18], "big")
+    page_size = 65536 if page_size == 1 else page_size
+    size = os.path.getsize(path)
+
+    # The in-header page count is only valid when both change counters agree
+    if header[24:28] != header[92:96]:
+        return size % page_size != 0
+    return size < page_size * int.from_bytes(header[28:32], "big")
+
+def _read_marker():
+    try:
+        with open(VERIFIED_MARKER, 'r') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+def _db_identity():
+    stat = os.stat(DB_FILE)
+    return [stat.st_dev, stat.st_ino]
+
+def _write_marker(manifest_id):
+    with open(VERIFIED_MARKER, 'w') as f:
+        json.dump({"manifest": manifest_id, "file": _db_identity()}, f)
+
+def _existing_db_ok(manifest, manifest_id):
+    """Whether the database on disk can be served as-is"""
+    if _sqlite_truncated(DB_FILE):
+        print(f"⚠️  {DB_FILE} is truncated; rebuilding")
+        return False
+
+    marker = _read_marker()
+    if marker is not None and marker.get("file") == _db_identity():
+        if marker.get("manifest") != manifest_id:
+            print(f"⚠️  Chunks changed since {DB_FILE} was combined; delete it to rebuild")
+        return True
+
+    # A complete database that differs from the chunks is most likely
+    # one loaded or migrated locally, so it is kept as-is
+    size = os.path.getsize(DB_FILE)
+    if size != manifest["size"] or (
+        manifest["sha256"] and _file_sha256(DB_FILE) != manifest["sha256"]
+    ):
+        print(f"⚠️  {DB_FILE} differs from the chunks; keeping it (delete it to rebuild)")
+        return True
+
+    _write_marker(manifest_id)
+    return True
+
+def _restore_chunk(fd, chunk, codec):
+    """
+    Streams one chunk to its offset in the output file and returns
+    (bytes written, sha256 of the restored bytes).
+    """
+    buffer = bytearray(COPY_BUFFER_SIZE)
+    view = memoryview(buffer)
+    digest = hashlib.sha256()
+    offset = chunk["offset"]
+
+    with open_reader(os.path.join(CHUNK_DIR, chunk["file"]), codec) as chunk_f:
+        while n := chunk_f.readinto(buffer):
+            if offset + n > chunk["offset"] + chunk["size"]:
+                raise ValueError(f"{chunk['file']} is larger than the manifest says")
+            written = 0
+            while written < n:
+                written += os.pwrite(fd, view[written:n], offset + written)
+            digest.update(view[:n])
+            offset += n
+
+    return offset - chunk["offset"], digest.hexdigest()
+
+def _assemble(manifest, tmp_file, workers):
+    """Restores every chunk into tmp_file, verifying sizes and hashes"""
+    codec = manifest.get("compression", "none")
+    chunks = manifest["chunks"]
+
+    # The chunks must tile the whole file, so that per-chunk hashes
+    # cover every byte
+    expected = 0
+    for chunk in sorted(chunks, key=lambda c: c["offset"]):
+        if chunk["offset"] != expected:
+            raise ValueError(f"{chunk['file']} does not start where the previous chunk ends")
+        expected += chunk["size"]
+    if expected != manifest["size"]:
+        raise ValueError(f"Chunks add up to {expected} bytes, expected {manifest['size']}")
+
+    fd = os.open(tmp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        if hasattr(os, "posix_fallocate") and manifest["size"]:
+            os.posix_fallocate(fd, 0, manifest["size"])
+        else:
+            os.ftruncate(fd, manifest["size"])
+
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(chunks) or 1))) as pool:
+            results = pool.map(lambda chunk: _restore_chunk(fd, chunk, codec), chunks)
+            for chunk, (copied, sha256) in zip(chunks, results):
+                print(f"  Restored {chunk['file']}")
+                if copied != chunk["size"]:
+                    raise ValueError(f"{chunk['file']} restored {copied} bytes, expected {chunk['size']}")
+                if chunk["sha256"] and sha256 != chunk["sha256"]:
+                    raise ValueError(f"{chunk['file']} does not match its checksum")
+
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def combine_chunks(workers=RESTORE_WORKERS):
+    """
+    Combine database chunks back into full file
+
+    - workers: chunks restored concurrently (default DB_CHUNK_WORKERS)
+    """
 
-def combine_chunks():
-    """Combine database chunks back into full file"""
-    
     # Check if chunks exist
     chunk_files = sorted(glob.glob(os.path.join(CHUNK_DIR, f"{DB_FILE}.chunk*")))
-    
+
     if not chunk_files:
         if os.path.exists(DB_FILE):
             print(f"✅ {DB_FILE} already exists")
         else:
             print(f"⚠️  No chunks or database found")
         return True
-    
-    # If full DB already exists, skip
-    if os.path.exists(DB_FILE):
-        print(f"✅ {DB_FILE} already combined")
+
+    try:
+        manifest = load_manifest(chunk_files)
+    except (OSError, ValueError) as e:
+        print(f"❌ Error reading chunk manifest: {e}")
+        return False
+    manifest_id = _manifest_id(manifest)
+
+    # A marker without its database describes nothing
+    if not os.path.exists(DB_FILE) and os.path.exists(VERIFIED_MARKER):
+        os.remove(VERIFIED_MARKER)
+
+    # If a complete DB already exists, skip
+    if os.path.exists(DB_FILE) and _existing_db_ok(manifest, manifest_id):
+        print(f"✅ Using existing {DB_FILE}")
         return True
-    
-    print(f"🔄 Combining {len(chunk_files)} chunks into {DB_FILE}...")
-    
+
+    print(f"🔄 Combining {len(manifest['chunks'])} chunks into {DB_FILE}...")
+
+    tmp_file = f"{DB_FILE}.{os.getpid()}.tmp"
     try:
-        with open(DB_FILE, 'wb') as output_file:
-            for chunk_file in chunk_files:
-                print(f"  Reading {os.path.basename(chunk_file)}")
-                with open(chunk_file, 'rb') as chunk_f:
-                    output_file.write(chunk_f.read())
-        
+        _assemble(manifest, tmp_file, workers)
+
+        # Journal files of the database being replaced don't belong to the new one
+        for suffix in ("-wal", "-shm", "-journal"):
+            if os.path.exists(DB_FILE + suffix):
+                os.remove(DB_FILE + suffix)
+
+        os.replace(tmp_file, DB_FILE)
+        _write_marker(manifest_id)
+
         combined_size = os.path.getsize(DB_FILE)
         print(f"✅ Database reconstructed ({combined_size / (1024**2):.1f}MB)")
         return True
-        
+
     except Exception as e:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
         print(f"❌ Error combining chunks: {e}")
         return False
 
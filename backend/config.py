@@ -6,6 +6,20 @@ load_dotenv()
 
 # Database
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./aadhaar_pulse.db")
+DATABASE_READ_ONLY = os.getenv("DATABASE_READ_ONLY", "false").lower() == "true"
+
+# Connection pool (server databases; SQLite files reuse the sizing)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 8))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 8))
+DB_POOL_TIMEOUT_SECONDS = int(os.getenv("DB_POOL_TIMEOUT_SECONDS", 30))
+DB_POOL_RECYCLE_SECONDS = int(os.getenv("DB_POOL_RECYCLE_SECONDS", 1800))
+
+# SQLite connection profile (PRAGMAs applied on every new connection)
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", 64 * 1024))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", 512 * 1024 * 1024))
+SQLITE_TEMP_STORE = os.getenv("SQLITE_TEMP_STORE", "MEMORY")
 
 # API
 API_HOST = os.getenv("API_HOST", "0.0.0.0")
@@ -15,3 +29,17 @@ API_PORT = int(os.getenv("API_PORT", 8000))
 ENROLMENT_DATA_DIR = "data/enrolment"
 DEMOGRAPHIC_DATA_DIR = "data/demographic_update"
 BIOMETRIC_DATA_DIR = "data/biometric_update"
+
+# Forecasting
+FORECAST_WORKERS = int(os.getenv("FORECAST_WORKERS", os.cpu_count() or 1))
+FORECAST_DISTRICT_TIMEOUT_SECONDS = int(os.getenv("FORECAST_DISTRICT_TIMEOUT_SECONDS", 60))
+TOP_GROWTH_DEADLINE_SECONDS = int(os.getenv("TOP_GROWTH_DEADLINE_SECONDS", 240))
+FORECAST_CACHE_PATH = os.getenv("FORECAST_CACHE_PATH", "forecast_cache.db")
+
+# Background forecast precomputation
+# Off by default; when enabled, only the process holding the lock file runs it
+FORECAST_SCHEDULER_ENABLED = os.getenv("FORECAST_SCHEDULER_ENABLED", "false").lower() == "true"
+FORECAST_SCHEDULER_INTERVAL_SECONDS = int(os.getenv("FORECAST_SCHEDULER_INTERVAL_SECONDS", 60))
+FORECAST_SCHEDULER_LOCK_PATH = os.getenv("FORECAST_SCHEDULER_LOCK_PATH", "forecast_scheduler.lock")
+FORECAST_PRECOMPUTE_HORIZONS = [30, 60, 90, 180]
+FORECAST_PRECOMPUTE_METHOD = os.getenv("FORECAST_PRECOMPUTE_METHOD", "prophet")
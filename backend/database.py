@@ -1,14 +1,95 @@
 """Database connection and session management"""
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool, StaticPool
 import config
 
+def _engine_options(url):
+    """Pool class and sizing for the configured backend"""
+    if url.get_backend_name() != "sqlite":
+        return {
+            "poolclass": QueuePool,
+            "pool_size": config.DB_POOL_SIZE,
+            "max_overflow": config.DB_MAX_OVERFLOW,
+            "pool_timeout": config.DB_POOL_TIMEOUT_SECONDS,
+            "pool_recycle": config.DB_POOL_RECYCLE_SECONDS,
+            "pool_pre_ping": True,
+        }
+
+    options = {"connect_args": {"check_same_thread": False}}
+    if url.database in (None, "", ":memory:"):
+        # One shared connection, or every session sees its own empty database
+        options["poolclass"] = StaticPool
+    else:
+        # Long-lived connections keep their page cache and mmap warm
+        options.update(
+            poolclass=QueuePool,
+            pool_size=config.DB_POOL_SIZE,
+            max_overflow=config.DB_MAX_OVERFLOW,
+            pool_timeout=config.DB_POOL_TIMEOUT_SECONDS,
+        )
+    return options
+
+# Before district and pincode facts got their own tables, both grains
+# shared this one (district-level rows had pincode NULL)
+LEGACY_FACT_TABLE = "migration_index"
+FACT_COLUMNS = "date, state, district, child_enrolments, adult_updates, migration_index, year, month"
+FACT_TABLES = ("migration_district_daily", "migration_pincode_daily")
+
 # Create database engine
-engine = create_engine(
-    config.DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in config.DATABASE_URL else {}
-)
+engine = create_engine(config.DATABASE_URL, **_engine_options(make_url(config.DATABASE_URL)))
+
+@event.listens_for(engine, "connect")
+def _apply_sqlite_profile(dbapi_connection, connection_record):
+    """
+    Tunes every new SQLite connection:
+    - WAL journal: readers don't block the writer (or each other)
+    - synchronous=NORMAL: durable enough under WAL, far fewer fsyncs on bulk loads
+    - page cache, mmap and in-memory temp tables sized from config
+    - a legacy combined fact table mapped onto the per-grain names
+    - query_only on read replicas (DATABASE_READ_ONLY)
+    """
+    if engine.dialect.name != "sqlite":
+        return
+
+    cursor = dbapi_connection.cursor()
+    try:
+        if not config.DATABASE_READ_ONLY:
+            # Persistent, and needs write access to the file
+            cursor.execute(f"PRAGMA journal_mode={config.SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous={config.SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA cache_size=-{config.SQLITE_CACHE_SIZE_KB}")
+        cursor.execute(f"PRAGMA mmap_size={config.SQLITE_MMAP_SIZE}")
+        cursor.execute(f"PRAGMA temp_store={config.SQLITE_TEMP_STORE}")
+        _legacy_fact_views(cursor)
+        if config.DATABASE_READ_ONLY:
+            cursor.execute("PRAGMA query_only=ON")
+    finally:
+        cursor.close()
+
+def _legacy_fact_views(cursor):
+    """
+    Until a database still in the combined migration_index schema is
+    split (migration_etl.py --migrate-legacy), serve the per-grain tables
+    from temporary (per-connection) views over it.
+    """
+    tables = {
+        row[0] for row in
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'").fetchall()
+    }
+    if LEGACY_FACT_TABLE not in tables or FACT_TABLES[0] in tables:
+        return
+
+    cursor.execute(
+        f"CREATE TEMP VIEW IF NOT EXISTS {FACT_TABLES[0]} AS "
+        f"SELECT id, {FACT_COLUMNS} FROM {LEGACY_FACT_TABLE} WHERE pincode IS NULL"
+    )
+    cursor.execute(
+        f"CREATE TEMP VIEW IF NOT EXISTS {FACT_TABLES[1]} AS "
+        f"SELECT id, {FACT_COLUMNS}, pincode FROM {LEGACY_FACT_TABLE} WHERE pincode IS NOT NULL"
+    )
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -24,6 +105,87 @@ def get_db():
     finally:
         db.close()
 
+def _sync_indexes(tables):
+    """
+    create_all() only indexes tables it creates, so bring existing tables
+    in line with the models: create declared indexes that are missing and
+    drop our own (ix_*/idx_*) indexes the models no longer declare.
+    """
+    inspector = inspect(engine)
+    for table in tables:
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        declared = {index.name for index in table.indexes}
+
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(bind=engine)
+
+        for name in sorted(existing - declared):
+            if name.startswith(("ix_", "idx_")):
+                with engine.begin() as conn:
+                    conn.exec_driver_sql(f'DROP INDEX IF EXISTS "{name}"')
+
+def legacy_facts_pending():
+    """Whether the database still holds the combined migration_index table instead of the per-grain ones"""
+    # Table names of the main schema only: the stand-in views are temporary
+    tables = inspect(engine).get_table_names()
+    return LEGACY_FACT_TABLE in tables and FACT_TABLES[0] not in tables
+
+def split_legacy_facts():
+    """
+    Moves the rows of a combined migration_index table into the
+    per-grain tables and drops it, in one transaction. Run through
+    `python migration_etl.py --migrate-legacy`, then restart API
+    processes (their connections still read through the stand-in views).
+
+    Returns (district rows, pincode rows), or None when there is nothing
+    to migrate.
+    """
+    if not legacy_facts_pending():
+        return None
+
+    with engine.begin() as conn:
+        if engine.dialect.name == "sqlite":
+            # The stand-in views would shadow the new tables on this connection
+            for name in FACT_TABLES:
+                conn.exec_driver_sql(f"DROP VIEW IF EXISTS temp.{name}")
+
+        Base.metadata.create_all(bind=conn, tables=[Base.metadata.tables[name] for name in FACT_TABLES])
+        district_rows = conn.exec_driver_sql(
+            f"INSERT INTO {FACT_TABLES[0]} ({FACT_COLUMNS}) "
+            f"SELECT {FACT_COLUMNS} FROM {LEGACY_FACT_TABLE} WHERE pincode IS NULL"
+        ).rowcount
+        pincode_rows = conn.exec_driver_sql(
+            f"INSERT INTO {FACT_TABLES[1]} ({FACT_COLUMNS}, pincode) "
+            f"SELECT {FACT_COLUMNS}, pincode FROM {LEGACY_FACT_TABLE} WHERE pincode IS NOT NULL"
+        ).rowcount
+        conn.exec_driver_sql(f"DROP TABLE {LEGACY_FACT_TABLE}")
+
+    return district_rows, pincode_rows
+
 def init_db():
-    """Initialize database tables"""
-    Base.metadata.create_all(bind=engine)
+    """
+    Initialize database tables and indexes. A legacy combined fact table
+    is only detected here (and served through views on SQLite); splitting
+    it is an explicit step, see split_legacy_facts().
+    """
+    pending = legacy_facts_pending()
+    if pending:
+        if engine.dialect.name != "sqlite":
+            raise RuntimeError(
+                f"Database still has the combined {LEGACY_FACT_TABLE} table; "
+                f"run `python migration_etl.py --migrate-legacy` first"
+            )
+        print(f"⚠️  Serving the legacy {LEGACY_FACT_TABLE} table through views; "
+              f"run `python migration_etl.py --migrate-legacy` to split it")
+
+    if config.DATABASE_READ_ONLY:
+        return
+
+    # While pending, the fact tables must not be created empty over the views
+    tables = [
+        table for table in Base.metadata.sorted_tables
+        if not (pending and table.name in FACT_TABLES)
+    ]
+    Base.metadata.create_all(bind=engine, tables=tables)
+    _sync_indexes(tables)
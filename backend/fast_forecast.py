@@ -0,0 +1,158 @@
+"""
+NumPy Holt-Winters forecasting engine (method="fast").
+
+Damped additive trend + additive weekly seasonality, i.e. ETS(A,Ad,A),
+fitted for every district of a batch at once: each district is a
+column of a (days x districts) matrix and the smoothing recursions
+run over time on whole vectors, for every candidate parameter set
+simultaneously. The best parameters are chosen per district by
+in-sample squared error, and prediction intervals use the analytic
+ETS(A,Ad,A) forecast variance.
+
+Output frames match forecast_prophet:
+    date, predicted_index, lower_bound, upper_bound
+"""
+
+import itertools
+
+import numpy as np
+import pandas as pd
+
+SEASON_LENGTH = 7
+DAMPING = 0.98
+INTERVAL_Z = 1.959964  # 95%, same width as the Prophet models
+MIN_OBSERVATIONS = 5
+
+ALPHAS = [0.05, 0.2, 0.4, 0.7]
+BETAS = [0.0, 0.02, 0.1]
+GAMMAS = [0.0, 0.1, 0.3]
+
+
+def _parameter_grid():
+    grid = np.array(list(itertools.product(ALPHAS, BETAS, GAMMAS)))
+    return grid[:, 0], grid[:, 1], grid[:, 2]
+
+
+def _to_matrix(histories: dict):
+    """
+    Daily (T x N) matrix of migration_index on a shared calendar;
+    NaN where a district has no observation.
+    """
+    names = list(histories)
+    days = [
+        pd.to_datetime(histories[name]['date']).to_numpy().astype('datetime64[D]')
+        for name in names
+    ]
+    start = min(d.min() for d in days)
+    end = max(d.max() for d in days)
+
+    matrix = np.full(((end - start).astype(int) + 1, len(names)), np.nan)
+    for col, (name, d) in enumerate(zip(names, days)):
+        # Histories are already one row per date
+        matrix[(d - start).astype(int), col] = histories[name]['migration_index'].to_numpy(dtype=float)
+
+    calendar = pd.date_range(pd.Timestamp(start), pd.Timestamp(end), freq='D')
+    return names, calendar, matrix
+
+
+def _smooth(y: np.ndarray, alpha, beta, gamma):
+    """
+    Runs the ETS(A,Ad,A) recursions for K parameter sets x N series.
+
+    - y: (T, N) observations with NaN gaps
+    - alpha, beta, gamma: (K,) smoothing parameters
+
+    Days before a series' first observation and after its last one
+    leave its state untouched; gaps inside it advance the state on the
+    model's own prediction. Returns the final states, in-sample SSE and
+    the number of fitted observations, all per (K, N).
+    """
+    T, N = y.shape
+    K = alpha.shape[0]
+    a, b, g = alpha[:, None], beta[:, None], gamma[:, None]
+
+    observed = ~np.isnan(y)
+    first = observed.argmax(axis=0)
+    last = T - 1 - observed[::-1].argmax(axis=0)
+
+    level = np.broadcast_to(y[first, np.arange(N)], (K, N)).copy()
+    trend = np.zeros((K, N))
+    season = np.zeros((SEASON_LENGTH, K, N))
+    sse = np.zeros((K, N))
+
+    for t in range(T):
+        active = (t > first) & (t <= last)
+        if not active.any():
+            continue
+
+        slot = t % SEASON_LENGTH
+        predicted = level + DAMPING * trend + season[slot]
+        error = np.where(observed[t], y[t] - predicted, 0.0)
+        error = np.where(active, error, 0.0)
+
+        level = np.where(active, level + DAMPING * trend + a * error, level)
+        trend = np.where(active, DAMPING * trend + b * error, trend)
+        season[slot] = season[slot] + g * error
+        sse += error ** 2
+
+    fitted = np.maximum(observed.sum(axis=0) - 1, 1)
+    return level, trend, season, sse, fitted, last
+
+
+def forecast_batch(histories: dict, periods: int = 30) -> dict:
+    """
+    Forecasts every series in `histories` (name -> frame with 'date' and
+    'migration_index') in one pass. Returns name -> forecast frame, or
+    None where there are fewer than MIN_OBSERVATIONS points.
+    """
+    usable = {
+        name: df for name, df in histories.items()
+        if df is not None and df['migration_index'].notna().sum() >= MIN_OBSERVATIONS
+    }
+    results = {name: None for name in histories}
+    if not usable:
+        return results
+
+    names, calendar, y = _to_matrix(usable)
+    alpha, beta, gamma = _parameter_grid()
+    level, trend, season, sse, fitted, last = _smooth(y, alpha, beta, gamma)
+
+    # Best parameter set per series
+    best = sse.argmin(axis=0)
+    cols = np.arange(len(names))
+    level, trend = level[best, cols], trend[best, cols]
+    season = season[:, best, cols]
+    a, b, g = alpha[best], beta[best], gamma[best]
+    sigma2 = sse[best, cols] / fitted
+
+    # h-step point forecasts from each series' own last observation
+    h = np.arange(1, periods + 1)[:, None]
+    damp_sum = np.cumsum(DAMPING ** np.arange(1, periods + 1))[:, None]
+    slots = (last[None, :] + h) % SEASON_LENGTH
+    predicted = level + damp_sum * trend + season[slots, cols]
+
+    # Var(h) = sigma^2 * (1 + sum_{j<h} c_j^2),
+    # c_j = alpha + beta * phi_j + gamma * [j % m == 0]
+    j = np.arange(1, periods)[:, None]
+    c = a + b * damp_sum[:-1] + g * (j % SEASON_LENGTH == 0)
+    cumulative = np.vstack([np.zeros((1, len(names))), np.cumsum(c ** 2, axis=0)])
+    spread = INTERVAL_Z * np.sqrt(sigma2 * (1 + cumulative))
+
+    # Same clamping as forecast_prophet
+    lower = np.maximum(predicted - spread, 0)
+    upper = np.maximum(predicted + spread, predicted)
+
+    for i, name in enumerate(names):
+        results[name] = pd.DataFrame({
+            'date': pd.date_range(calendar[last[i]] + pd.Timedelta(days=1), periods=periods, freq='D'),
+            'predicted_index': predicted[:, i],
+            'lower_bound': lower[:, i],
+            'upper_bound': upper[:, i]
+        })
+
+    return results
+
+
+def forecast_series(df: pd.DataFrame, periods: int = 30) -> pd.DataFrame:
+    """Single-district convenience wrapper around forecast_batch"""
+    return forecast_batch({'series': df}, periods)['series']
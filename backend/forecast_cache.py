@@ -0,0 +1,190 @@
+"""
+Persistent store for district forecast results.
+
+Entries are keyed by (state, district, method, data_version, periods).
+data_version fingerprints the district's rows in
+migration_district_daily, so loading new data makes older entries
+unreachable; the ETL also deletes them for the districts it touched. A request for a shorter horizon is
+served from the shortest cached horizon that covers it. Every
+invalidation also bumps a generation counter that the forecast
+scheduler polls instead of re-fingerprinting the table.
+"""
+
+import json
+import sqlite3
+import hashlib
+from contextlib import contextmanager
+from datetime import date, datetime
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from models import MigrationDistrictDaily
+import config
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS forecasts (
+    state TEXT NOT NULL,
+    district TEXT NOT NULL,
+    method TEXT NOT NULL,
+    data_version TEXT NOT NULL,
+    periods INTEGER NOT NULL,
+    result TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    PRIMARY KEY (state, district, method, data_version, periods)
+)
+"""
+
+# One-row counter bumped by invalidate(), so pollers can notice an ETL
+# load without fingerprinting migration_district_daily
+_GENERATION_SCHEMA = """
+CREATE TABLE IF NOT EXISTS generation (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    value INTEGER NOT NULL
+)
+"""
+
+
+def _connect():
+    conn = sqlite3.connect(config.FORECAST_CACHE_PATH, timeout=10)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(_SCHEMA)
+    conn.execute(_GENERATION_SCHEMA)
+    return conn
+
+
+@contextmanager
+def _store():
+    conn = _connect()
+    try:
+        with conn:  # commit on success, roll back on error
+            yield conn
+    finally:
+        conn.close()
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Cannot serialise {type(value).__name__}")
+
+
+# -----------------------------
+# DATA VERSIONS
+# -----------------------------
+
+def _version(count, last_date, child, adult, index_sum) -> str:
+    fingerprint = f"{count}|{last_date}|{child}|{adult}|{round(index_sum or 0, 6)}"
+    return hashlib.sha1(fingerprint.encode("utf-8")).hexdigest()[:16]
+
+
+def _version_columns():
+    return (
+        func.count(),
+        func.max(MigrationDistrictDaily.date),
+        func.sum(MigrationDistrictDaily.child_enrolments),
+        func.sum(MigrationDistrictDaily.adult_updates),
+        func.sum(MigrationDistrictDaily.migration_index)
+    )
+
+
+def district_data_version(db: Session, state: str, district: str) -> str:
+    """
+    Fingerprint of a district's district-level history.
+    """
+    row = db.query(*_version_columns()).filter(
+        MigrationDistrictDaily.state == state,
+        MigrationDistrictDaily.district == district
+    ).one()
+    return _version(*row)
+
+
+def table_data_version(db: Session):
+    """
+    Fingerprint of all district-level rows (changes after any ETL load),
+    or None while the table is empty.
+    """
+    row = db.query(*_version_columns()).one()
+    return _version(*row) if row[0] else None
+
+
+def state_data_versions(db: Session, state: str) -> dict:
+    """
+    district -> fingerprint for every district of a state, in one query.
+    """
+    rows = db.query(MigrationDistrictDaily.district, *_version_columns()).filter(
+        MigrationDistrictDaily.state == state
+    ).group_by(MigrationDistrictDaily.district).all()
+    return {district: _version(*values) for district, *values in rows}
+
+
+# -----------------------------
+# STORE
+# -----------------------------
+
+def get(state: str, district: str, method: str, periods: int, data_version: str):
+    """
+    Returns (cached_periods, result) for the shortest cached horizon
+    >= periods, or None.
+    """
+    with _store() as conn:
+        row = conn.execute(
+            "SELECT periods, result FROM forecasts "
+            "WHERE state = ? AND district = ? AND method = ? "
+            "AND data_version = ? AND periods >= ? "
+            "ORDER BY periods LIMIT 1",
+            (state, district, method, data_version, periods)
+        ).fetchone()
+
+    if row is None:
+        return None
+    return row[0], json.loads(row[1])
+
+
+def put(state: str, district: str, method: str, periods: int,
+        data_version: str, result: dict):
+    payload = json.dumps(result, default=_json_default)
+
+    with _store() as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO forecasts "
+            "(state, district, method, data_version, periods, result, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (state, district, method, data_version, periods, payload,
+             datetime.utcnow().isoformat())
+        )
+        # Results for older data can never be hit again
+        conn.execute(
+            "DELETE FROM forecasts WHERE state = ? AND district = ? "
+            "AND data_version != ?",
+            (state, district, data_version)
+        )
+
+
+def invalidate(districts=None) -> int:
+    """
+    Drops cached forecasts for (state, district) pairs, or everything.
+    Returns the number of entries removed.
+    """
+    with _store() as conn:
+        conn.execute(
+            "INSERT INTO generation (id, value) VALUES (0, 1) "
+            "ON CONFLICT (id) DO UPDATE SET value = value + 1"
+        )
+        if districts is None:
+            return conn.execute("DELETE FROM forecasts").rowcount
+
+        return conn.executemany(
+            "DELETE FROM forecasts WHERE state = ? AND district = ?",
+            list(districts)
+        ).rowcount
+
+
+def generation() -> int:
+    """Number of invalidate() calls against this store (0 if none yet)"""
+    with _store() as conn:
+        row = conn.execute("SELECT value FROM generation WHERE id = 0").fetchone()
+    return row[0] if row else 0
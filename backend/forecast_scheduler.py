@@ -0,0 +1,232 @@
+"""
+Background precomputation of district forecasts.
+
+Off unless FORECAST_SCHEDULER_ENABLED is set. An asyncio task started
+with the app takes an exclusive lock file, so only one process of a
+multi-worker deployment runs the job; the others keep retrying the lock
+and take over if the holder exits. The holder polls the forecast store's
+generation counter (bumped by every ETL load) and, when it moves,
+fingerprints migration_district_daily and refits every district into
+the store, most requested districts first. Only the longest horizon is
+fitted: shorter horizons are served from it by truncation in the store.
+Fits run in the shared forecast process pool, never in the server
+process.
+"""
+
+import os
+import asyncio
+import threading
+from collections import Counter
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, assume a single server process
+    fcntl = None
+
+from database import SessionLocal
+from models import MigrationDistrictDaily
+from forecasting import MigrationForecaster, build_forecast_in_pool
+from app.services.executors import run_in
+import forecast_cache
+import config
+
+# (state, district) -> number of forecast requests seen by this process
+_request_counts = Counter()
+_counts_lock = threading.Lock()
+
+_progress = {
+    "status": "idle",
+    "data_version": None,
+    "method": None,
+    "periods": None,
+    "total": 0,
+    "completed": 0,
+    "cached": 0,
+    "failed": 0,
+    "current": None,
+    "started_at": None,
+    "finished_at": None,
+    "last_error": None
+}
+
+_task = None
+_lock_fd = None
+
+
+def record_request(state: str, district: str):
+    """Counts a forecast request so its district is precomputed sooner"""
+    with _counts_lock:
+        _request_counts[(state, district)] += 1
+
+
+def job_progress() -> dict:
+    with _counts_lock:
+        hottest = [
+            {"state": state, "district": district, "requests": count}
+            for (state, district), count in _request_counts.most_common(5)
+        ]
+    return {**_progress, "most_requested": hottest}
+
+
+# -----------------------------
+# BLOCKING HELPERS (run in a thread)
+# -----------------------------
+
+def _acquire_lock() -> bool:
+    """Takes the scheduler lock file without blocking; True if this process holds it"""
+    global _lock_fd
+    if _lock_fd is not None or fcntl is None:
+        return True
+
+    fd = os.open(config.FORECAST_SCHEDULER_LOCK_PATH, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        os.close(fd)
+        return False
+    _lock_fd = fd
+    return True
+
+
+def _release_lock():
+    global _lock_fd
+    if _lock_fd is not None:
+        os.close(_lock_fd)  # closing drops the flock
+        _lock_fd = None
+
+
+def _current_data_version():
+    db = SessionLocal()
+    try:
+        return forecast_cache.table_data_version(db)
+    finally:
+        db.close()
+
+
+def _list_districts() -> list:
+    db = SessionLocal()
+    try:
+        return db.query(MigrationDistrictDaily.state, MigrationDistrictDaily.district).distinct().all()
+    finally:
+        db.close()
+
+
+def _pending_history(state: str, district: str, periods: int, method: str):
+    """Returns (data_version, history), or None when the store already has it"""
+    db = SessionLocal()
+    try:
+        version = forecast_cache.district_data_version(db, state, district)
+        if forecast_cache.get(state, district, method, periods, version) is not None:
+            return None
+        return version, MigrationForecaster(db).get_historical_data(state, district)
+    finally:
+        db.close()
+
+
+async def _precompute_district(state: str, district: str, periods: int, method: str):
+    """Returns 'cached', 'fitted' or the failure message"""
+    pending = await run_in("db", _pending_history, state, district, periods, method)
+    if pending is None:
+        return "cached"
+
+    version, history = pending
+    # The forecast thread only waits on the pool, keeping precomputation
+    # and request-time forecasts within FORECAST_CONCURRENCY together
+    result = await run_in(
+        "forecast", build_forecast_in_pool, state, district, history, periods, method
+    )
+    if "forecast" not in result:
+        return result.get("message", "failed")
+
+    await run_in("db", forecast_cache.put, state, district, method, periods, version, result)
+    return "fitted"
+
+
+# -----------------------------
+# JOB LOOP
+# -----------------------------
+
+def _next_district(pending: set):
+    # Re-ranked every time so districts requested mid-run move up
+    with _counts_lock:
+        return max(pending, key=lambda key: (_request_counts.get(key, 0), key))
+
+
+async def _run_job(data_version: str):
+    periods = max(config.FORECAST_PRECOMPUTE_HORIZONS)
+    method = config.FORECAST_PRECOMPUTE_METHOD
+
+    pending = set(await run_in("db", _list_districts))
+    _progress.update(
+        status="running", data_version=data_version, method=method,
+        periods=periods, total=len(pending), completed=0, cached=0,
+        failed=0, current=None, started_at=datetime.utcnow().isoformat(),
+        finished_at=None, last_error=None
+    )
+
+    while pending:
+        state, district = _next_district(pending)
+        pending.discard((state, district))
+        _progress["current"] = {"state": state, "district": district}
+
+        try:
+            outcome = await _precompute_district(state, district, periods, method)
+        except Exception as e:
+            outcome = str(e)
+
+        _progress["completed"] += 1
+        if outcome == "cached":
+            _progress["cached"] += 1
+        elif outcome != "fitted":
+            _progress["failed"] += 1
+            _progress["last_error"] = {"state": state, "district": district, "message": outcome}
+
+    _progress.update(status="idle", current=None, finished_at=datetime.utcnow().isoformat())
+
+
+async def _scheduler_loop():
+    completed_version = None
+    seen_generation = None
+
+    while True:
+        try:
+            if not await run_in("db", _acquire_lock):
+                _progress.update(status="standby")
+            else:
+                # The full-table fingerprint only runs at startup and after
+                # an ETL load has bumped the store generation
+                generation = await run_in("db", forecast_cache.generation)
+                if generation != seen_generation:
+                    data_version = await run_in("db", _current_data_version)
+                    if data_version is not None and data_version != completed_version:
+                        await _run_job(data_version)
+                        completed_version = data_version
+                    seen_generation = generation
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            _progress.update(status="error", last_error={"message": str(e)})
+
+        await asyncio.sleep(config.FORECAST_SCHEDULER_INTERVAL_SECONDS)
+
+
+def start():
+    """Starts the scheduler on the running event loop (idempotent)"""
+    global _task
+    if not config.FORECAST_SCHEDULER_ENABLED:
+        return
+    if _task is None or _task.done():
+        _task = asyncio.get_running_loop().create_task(_scheduler_loop())
+
+
+async def stop():
+    global _task
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
+    _release_lock()
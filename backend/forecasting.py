@@ -1,14 +1,59 @@
 """ML Forecasting Module for Migration Index Prediction"""
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
-from prophet import Prophet
-from statsmodels.tsa.arima.model import ARIMA
+import os
+import importlib
+import logging
+import signal
+import threading
+import multiprocessing
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, as_completed, TimeoutError as FuturesTimeout
+from concurrent.futures.process import BrokenProcessPool
+from datetime import timedelta
 from sqlalchemy.orm import Session
-from models import MigrationIndex
+from models import MigrationDistrictDaily
+import forecast_cache
+import fast_forecast
+import config
 import warnings
 warnings.filterwarnings('ignore')
 
+logger = logging.getLogger(__name__)
+
+
+# -----------------------------
+# FORECAST ENGINES
+# -----------------------------
+# Prophet and statsmodels take seconds and hundreds of MB to import, so
+# they are loaded on first use; processes that never fit those models
+# (aggregate-only workers, method=fast) never pay for them.
+
+FORECAST_ENGINES = {
+    'prophet': ('prophet', 'Prophet'),
+    'arima': ('statsmodels.tsa.arima.model', 'ARIMA'),
+}
+
+_loaded_engines = {}
+_engines_lock = threading.Lock()
+
+
+def get_engine(name: str):
+    """Return the model class registered under `name`, importing it on first use"""
+    with _engines_lock:
+        if name not in _loaded_engines:
+            module_name, attribute = FORECAST_ENGINES[name]
+            module = importlib.import_module(module_name)
+            _loaded_engines[name] = getattr(module, attribute)
+        return _loaded_engines[name]
+
+
+def loaded_engines() -> list:
+    """Names of the engines imported so far in this process"""
+    with _engines_lock:
+        return sorted(_loaded_engines)
+
+
 class MigrationForecaster:
     """Forecast future migration index using Prophet and ARIMA"""
     
@@ -17,7 +62,7 @@ class MigrationForecaster:
     
     def get_available_states(self) -> list:
         """Get list of all available states in database"""
-        states = self.db.query(MigrationIndex.state).distinct().all()
+        states = self.db.query(MigrationDistrictDaily.state).distinct().all()
         
         # Valid Indian states and UTs (official names)
         valid_states = {
@@ -186,9 +231,8 @@ class MigrationForecaster:
         normalized_state = state_mapping.get(state.lower().strip(), state)
         
         # Query districts for normalized state
-        results = self.db.query(MigrationIndex.state, MigrationIndex.district).filter(
-            MigrationIndex.state.ilike(f"%{normalized_state}%") | (MigrationIndex.state == state),
-            MigrationIndex.pincode.is_(None)
+        results = self.db.query(MigrationDistrictDaily.state, MigrationDistrictDaily.district).filter(
+            MigrationDistrictDaily.state.ilike(f"%{normalized_state}%") | (MigrationDistrictDaily.state == state)
         ).distinct().all()
         
         # Extract unique district names, filtering out invalid entries
@@ -204,13 +248,44 @@ class MigrationForecaster:
     def get_historical_data(self, state: str, district: str) -> pd.DataFrame:
         """Fetch historical migration index data for a district"""
         # Query data
-        results = self.db.query(MigrationIndex).filter(
-            MigrationIndex.state == state,
-            MigrationIndex.district == district,
-            MigrationIndex.pincode.is_(None),  # District-level only
-            MigrationIndex.migration_index.isnot(None)
-        ).order_by(MigrationIndex.date).all()
+        results = self.db.query(
+            MigrationDistrictDaily.date,
+            MigrationDistrictDaily.migration_index,
+            MigrationDistrictDaily.child_enrolments,
+            MigrationDistrictDaily.adult_updates
+        ).filter(
+            MigrationDistrictDaily.state == state,
+            MigrationDistrictDaily.district == district,
+            MigrationDistrictDaily.migration_index.isnot(None)
+        ).order_by(MigrationDistrictDaily.date).all()
+        
+        return self._prepare_history(results)
+    
+    def get_state_historical_data(self, state: str) -> dict:
+        """Fetch historical data for every district of a state in one query"""
+        results = self.db.query(
+            MigrationDistrictDaily.district,
+            MigrationDistrictDaily.date,
+            MigrationDistrictDaily.migration_index,
+            MigrationDistrictDaily.child_enrolments,
+            MigrationDistrictDaily.adult_updates
+        ).filter(
+            MigrationDistrictDaily.state == state,
+            MigrationDistrictDaily.migration_index.isnot(None)
+        ).order_by(MigrationDistrictDaily.district, MigrationDistrictDaily.date).all()
+        
+        rows_by_district = {}
+        for r in results:
+            rows_by_district.setdefault(r.district, []).append(r)
         
+        return {
+            district: self._prepare_history(rows)
+            for district, rows in rows_by_district.items()
+        }
+    
+    @staticmethod
+    def _prepare_history(results) -> pd.DataFrame:
+        """Turn (date, migration_index, child_enrolments, adult_updates) rows into a daily series"""
         if not results:
             return None
         
@@ -275,6 +350,7 @@ class MigrationForecaster:
             return None
         
         # Initialize and fit Prophet model
+        Prophet = get_engine('prophet')
         model = Prophet(
             daily_seasonality=False,
             weekly_seasonality=True,
@@ -323,6 +399,7 @@ class MigrationForecaster:
         
         try:
             # Fit ARIMA model (p=1, d=1, q=1 - simple model)
+            ARIMA = get_engine('arima')
             model = ARIMA(ts_data['migration_index'], order=(1, 1, 1))
             fitted_model = model.fit()
             
@@ -351,6 +428,19 @@ class MigrationForecaster:
             print(f"ARIMA forecasting failed: {e}")
             return None
     
+    def forecast_fast(self, df: pd.DataFrame, periods: int = 30) -> pd.DataFrame:
+        """
+        Forecast using the NumPy Holt-Winters engine (see fast_forecast)
+        
+        Args:
+            df: Historical data with 'date' and 'migration_index' columns
+            periods: Number of days to forecast
+        
+        Returns:
+            DataFrame with forecasted values
+        """
+        return fast_forecast.forecast_series(df, periods)
+    
     def ensemble_forecast(self, state: str, district: str, periods: int = 30, method: str = 'prophet') -> dict:
         """
         Generate forecast for a district
@@ -359,14 +449,43 @@ class MigrationForecaster:
             state: State name
             district: District name
             periods: Number of days to forecast (default: 30)
-            method: 'prophet', 'arima', or 'ensemble'
+            method: 'prophet', 'arima', 'ensemble' or 'fast'
         
         Returns:
             Dictionary with forecast results
         """
+        # Serve from the forecast store while the district's data is unchanged
+        data_version = forecast_cache.district_data_version(self.db, state, district)
+        cached = forecast_cache.get(state, district, method, periods, data_version)
+        if cached is not None:
+            cached_periods, result = cached
+            return self._truncate_forecast(result, periods) if cached_periods > periods else result
+        
         # Get historical data
         historical_df = self.get_historical_data(state, district)
+        result = self.build_forecast(state, district, historical_df, periods, method)
+        
+        if 'forecast' in result:
+            forecast_cache.put(state, district, method, periods, data_version, result)
+        
+        return result
+    
+    def build_forecast(self, state: str, district: str, historical_df: pd.DataFrame,
+                       periods: int = 30, method: str = 'prophet') -> dict:
+        """
+        Fits a district's forecast from already loaded history (no database
+        or forecast store access, so it can run in a pool worker)
+        
+        Args:
+            state: State name
+            district: District name
+            historical_df: History from get_historical_data
+            periods: Number of days to forecast
+            method: 'prophet', 'arima', 'ensemble' or 'fast'
         
+        Returns:
+            Dictionary with forecast results
+        """
         if historical_df is None or len(historical_df) < 5:
             return {
                 'error': 'Insufficient historical data',
@@ -376,6 +495,10 @@ class MigrationForecaster:
         # Generate forecasts
         prophet_forecast = None
         arima_forecast = None
+        fast_result = None
+        
+        if method == 'fast':
+            fast_result = self.forecast_fast(historical_df, periods)
         
         if method in ['prophet', 'ensemble']:
             try:
@@ -421,6 +544,9 @@ class MigrationForecaster:
         elif method == 'arima' and arima_forecast is not None:
             result['forecast'] = arima_forecast.to_dict('records')
             
+        elif method == 'fast' and fast_result is not None:
+            result['forecast'] = fast_result.to_dict('records')
+            
         else:
             return {
                 'error': 'Forecasting failed',
@@ -432,6 +558,13 @@ class MigrationForecaster:
         
         return result
     
+    def _truncate_forecast(self, result: dict, periods: int) -> dict:
+        """Cut a cached longer-horizon result down to the requested horizon"""
+        result['forecast'] = result['forecast'][:periods]
+        result['forecast_period_days'] = periods
+        result['interpretation'] = self._interpret_forecast(result['forecast'])
+        return result
+    
     def _calculate_trend(self, df: pd.DataFrame) -> str:
         """Calculate if migration index is rising, falling, or stable"""
         if len(df) < 2:
@@ -492,44 +625,56 @@ class MigrationForecaster:
             'policy_impact': impact
         }
     
-    def get_top_growth_predictions(self, state: str, top_n: int = 10) -> list:
+    def get_top_growth_predictions(self, state: str, top_n: int = 10, method: str = 'prophet') -> list:
         """
         Get top N districts predicted to have highest migration
         
         Args:
             state: State name
             top_n: Number of top districts to return
+            method: 'prophet' (process pool, one fit per district) or
+                'fast' (all districts fitted in one batched pass)
         
         Returns:
             List of districts with predicted growth
         """
-        # Get all districts in state
-        districts = self.db.query(MigrationIndex.district).filter(
-            MigrationIndex.state == state,
-            MigrationIndex.pincode.is_(None)
-        ).distinct().all()
+        # One query for the whole state's history
+        histories = self.get_state_historical_data(state)
+        
+        if method == 'fast':
+            outcomes = _run_fast_forecasts(histories, periods=30)
+        else:
+            # Districts with a stored 30+ day prophet forecast skip the refit
+            versions = forecast_cache.state_data_versions(self.db, state)
+            outcomes = []
+            for district in list(histories):
+                cached = forecast_cache.get(state, district, 'prophet', 30, versions.get(district))
+                if cached is not None and cached[1].get('forecast'):
+                    forecast = cached[1]['forecast'][:30]
+                    outcomes.append((district, float(np.mean([f['predicted_index'] for f in forecast])), None))
+                    del histories[district]
+            outcomes.extend(_run_district_forecasts(histories, periods=30))
         
         predictions = []
         failed = []
-        for (district,) in districts:
-            forecast = self.ensemble_forecast(state, district, periods=30, method='prophet')
-            if 'forecast' in forecast and len(forecast['forecast']) > 0:
-                avg_pred = np.mean([f['predicted_index'] for f in forecast['forecast']])
+        for district, avg_pred, error in outcomes:
+            if error is None:
                 predictions.append({
                     'district': district,
                     'predicted_avg_index': float(avg_pred),
                     'status': self._get_status(avg_pred)
                 })
-            elif 'error' in forecast:
-                failed.append((district, forecast['message']))
+            else:
+                failed.append((district, error))
         
         # Sort by predicted index
         predictions.sort(key=lambda x: x['predicted_avg_index'], reverse=True)
         
         if len(predictions) == 0 and len(failed) > 0:
-            print(f"WARNING: No successful forecasts. First few failures:")
-            for dist, msg in failed[:3]:
-                print(f"  {dist}: {msg}")
+            logger.warning(
+                "No successful forecasts for %s. First few failures: %s",
+                state, "; ".join(f"{dist}: {msg}" for dist, msg in failed[:3])
+            )
         
         return predictions[:top_n]
     
@@ -544,3 +689,220 @@ class MigrationForecaster:
         else:
             return "Low Migration"
 
+
+
+# -----------------------------
+# PARALLEL DISTRICT FORECASTS
+# -----------------------------
+
+class DistrictForecastTimeout(BaseException):
+    # Not an Exception, so the models' broad `except Exception` handlers
+    # cannot swallow the alarm
+    pass
+
+
+def _raise_timeout(signum, frame):
+    raise DistrictForecastTimeout()
+
+
+def _child_pids() -> set:
+    """
+    Pids of this process's children, from /proc (empty where /proc is
+    unavailable).
+    """
+    pid = os.getpid()
+    try:
+        entries = [entry for entry in os.listdir('/proc') if entry.isdigit()]
+    except OSError:
+        return set()
+    
+    children = set()
+    for entry in entries:
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                stat = f.read()
+        except OSError:
+            continue  # exited meanwhile
+        # Fields after the parenthesised command name: state, ppid, ...
+        if int(stat.rsplit(')', 1)[1].split()[1]) == pid:
+            children.add(int(entry))
+    return children
+
+
+@contextmanager
+def _fit_deadline(timeout: int):
+    """
+    Raises DistrictForecastTimeout in the block after `timeout` seconds.
+    SIGALRM is only usable in a worker's main thread; elsewhere (or with
+    timeout 0) the block runs unbounded.
+    
+    The alarm only interrupts Python, so on timeout the processes the
+    block started (cmdstanpy's Stan optimiser for Prophet) are killed
+    rather than left running in the worker.
+    """
+    use_alarm = timeout and hasattr(signal, 'SIGALRM') and \
+        threading.current_thread() is threading.main_thread()
+    if not use_alarm:
+        yield
+        return
+    
+    existing = _child_pids()
+    previous = signal.signal(signal.SIGALRM, _raise_timeout)
+    signal.alarm(timeout)
+    try:
+        yield
+    except DistrictForecastTimeout:
+        for pid in _child_pids() - existing:
+            try:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+            except OSError:
+                pass  # already exited or reaped
+        raise
+    finally:
+        signal.alarm(0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _forecast_district(district: str, df: pd.DataFrame, periods: int, timeout: int):
+    """
+    Fits one district's Prophet model (runs inside a pool worker).
+    Returns (district, average predicted index, error message).
+    """
+    if df is None or len(df) < 5:
+        found = len(df) if df is not None else 0
+        return district, None, f'Need at least 5 data points, found {found}'
+    
+    try:
+        with _fit_deadline(timeout):
+            forecast = MigrationForecaster(None).forecast_prophet(df, periods)
+    except DistrictForecastTimeout:
+        return district, None, f'Timed out after {timeout}s'
+    except Exception as e:
+        return district, None, f'Prophet failed: {e}'
+    
+    if forecast is None or len(forecast) == 0:
+        return district, None, 'Could not generate prophet forecast with available data'
+    
+    return district, float(forecast['predicted_index'].mean()), None
+
+
+def _run_fast_forecasts(histories: dict, periods: int = 30):
+    """All districts in one batched Holt-Winters fit, same tuples as _run_district_forecasts"""
+    forecasts = fast_forecast.forecast_batch(histories, periods)
+    return [
+        (district, float(forecast['predicted_index'].mean()), None)
+        if forecast is not None and len(forecast) > 0
+        else (district, None, 'Need at least 5 data points')
+        for district, forecast in forecasts.items()
+    ]
+
+
+# One long-lived pool of fit processes per server process. Workers come
+# from a forkserver (spawn where unavailable) rather than forking the
+# multi-threaded server, and keep Prophet imported between requests.
+_district_pool = None
+_district_pool_lock = threading.Lock()
+
+
+def _get_district_pool() -> ProcessPoolExecutor:
+    global _district_pool
+    with _district_pool_lock:
+        if _district_pool is None:
+            method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+            context = multiprocessing.get_context(method)
+            if method == 'forkserver':
+                context.set_forkserver_preload([__name__])
+            _district_pool = ProcessPoolExecutor(
+                max_workers=max(1, config.FORECAST_WORKERS),
+                mp_context=context
+            )
+        return _district_pool
+
+
+def _discard_district_pool(pool):
+    """A worker died and broke the pool; the next call starts a new one"""
+    global _district_pool
+    with _district_pool_lock:
+        if _district_pool is pool:
+            _district_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_district_pool():
+    global _district_pool
+    with _district_pool_lock:
+        pool, _district_pool = _district_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _build_district_forecast(state: str, district: str, df: pd.DataFrame,
+                             periods: int, method: str, timeout: int) -> dict:
+    """Runs MigrationForecaster.build_forecast inside a pool worker"""
+    try:
+        with _fit_deadline(timeout):
+            return MigrationForecaster(None).build_forecast(state, district, df, periods, method)
+    except DistrictForecastTimeout:
+        return {'error': 'Forecasting failed', 'message': f'Timed out after {timeout}s'}
+
+
+def build_forecast_in_pool(state: str, district: str, df: pd.DataFrame,
+                           periods: int = 30, method: str = 'prophet') -> dict:
+    """
+    Blocking: fits one district's forecast in the shared process pool,
+    cut off after config.FORECAST_DISTRICT_TIMEOUT_SECONDS. Same result
+    dict as MigrationForecaster.build_forecast.
+    """
+    pool = _get_district_pool()
+    future = pool.submit(
+        _build_district_forecast, state, district, df, periods, method,
+        config.FORECAST_DISTRICT_TIMEOUT_SECONDS
+    )
+    try:
+        return future.result()
+    except BrokenProcessPool:
+        _discard_district_pool(pool)
+        raise
+
+
+def _run_district_forecasts(histories: dict, periods: int = 30):
+    """
+    Fans district fits out over the shared process pool
+    (config.FORECAST_WORKERS processes, at least one). Each fit is cut
+    off after config.FORECAST_DISTRICT_TIMEOUT_SECONDS, and districts
+    still pending when config.TOP_GROWTH_DEADLINE_SECONDS expires are
+    reported as failures, so callers get partial results.
+    """
+    if not histories:
+        return []
+    
+    timeout = config.FORECAST_DISTRICT_TIMEOUT_SECONDS
+    pool = _get_district_pool()
+    
+    results = []
+    futures = {
+        pool.submit(_forecast_district, district, df, periods, timeout): district
+        for district, df in histories.items()
+    }
+    try:
+        for future in as_completed(futures, timeout=config.TOP_GROWTH_DEADLINE_SECONDS):
+            try:
+                results.append(future.result())
+            except BrokenProcessPool as e:
+                _discard_district_pool(pool)
+                results.append((futures[future], None, f'Worker failed: {e}'))
+            except Exception as e:
+                results.append((futures[future], None, f'Worker failed: {e}'))
+    except FuturesTimeout:
+        # Pending fits are dropped; running ones stop at their own timeout
+        for future in futures:
+            future.cancel()
+        done = {r[0] for r in results}
+        results.extend(
+            (district, None, 'Skipped: state forecast deadline reached')
+            for district in futures.values()
+            if district not in done
+        )
+    
+    return results
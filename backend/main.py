@@ -2,7 +2,6 @@
 from fastapi import FastAPI, Depends, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, desc
 from typing import List, Optional
 from datetime import datetime, date
 
@@ -11,7 +10,13 @@ from combine_chunks import combine_chunks
 combine_chunks()
 
 from database import get_db, init_db
-from models import MigrationIndex
+from migration_queries import (
+    state_summary,
+    district_summary,
+    pincode_summary,
+    trend_rows,
+    raw_rows
+)
 from schemas import (
     MigrationIndexResponse, 
     StateSummaryResponse, 
@@ -20,7 +25,9 @@ from schemas import (
     TrendResponse,
     TrendDataPoint
 )
-from forecasting import MigrationForecaster
+from forecasting import MigrationForecaster, shutdown_district_pool
+import forecast_scheduler
+from app.services.executors import run_in, shutdown_executors
 from app.routers import data_inspect, aggregations, stations, data_cleaning, district_anomalies,insights
 import config
 
@@ -55,6 +62,14 @@ app.include_router(insights.router)
 async def startup_event():
     init_db()
     print("✅ Database initialized")
+    forecast_scheduler.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await forecast_scheduler.stop()
+    shutdown_executors()
+    shutdown_district_pool()
 
 
 @app.get("/")
@@ -71,15 +86,18 @@ async def root():
             "trend": "/migration/trend/{state}/{district}",
             "forecast": "/migration/forecast/{state}/{district}",
             "top_growth": "/migration/forecast/top-growth/{state}",
+            "forecast_jobs": "/migration/forecast/jobs",
             "available_states": "/migration/available-states",
             "districts_for_state": "/migration/districts/{state}",
             "aggregate_national": "/aggregate/national",
             "aggregate_state": "/aggregate/state",
             "aggregate_district": "/aggregate/district",
             "station_estimate": "/estimate/stations/district",
+            "station_estimate_national": "/estimate/stations/national",
             "data_cleaning": "/data-cleaning/run/{dataset}",
             "data_cleaning_logs": "/data-cleaning/logs",
-            "district_anomalies": "/data-cleaning/district-anomalies"
+            "district_anomalies": "/data-cleaning/district-anomalies",
+            "district_anomalies_national": "/data-cleaning/district-anomalies/national"
         }
     }
 
@@ -88,7 +106,7 @@ async def root():
 async def get_available_states(db: Session = Depends(get_db)):
     """Get list of all available states"""
     forecaster = MigrationForecaster(db)
-    states = forecaster.get_available_states()
+    states = await run_in("db", forecaster.get_available_states)
     return {
         "total_states": len(states),
         "states": states
@@ -99,7 +117,7 @@ async def get_available_states(db: Session = Depends(get_db)):
 async def get_districts_for_state(state: str, db: Session = Depends(get_db)):
     """Get list of all districts for a state"""
     forecaster = MigrationForecaster(db)
-    districts = forecaster.get_districts_for_state(state)
+    districts = await run_in("db", forecaster.get_districts_for_state, state)
     
     if not districts:
         raise HTTPException(
@@ -126,60 +144,27 @@ async def get_state_migration(
     - **state**: State name
     - **year**: Optional year filter (defaults to latest available year)
     """
-    # If no year specified, get the latest year
-    if year is None:
-        latest = db.query(func.max(MigrationIndex.year)).filter(
-            MigrationIndex.state == state
-        ).scalar()
-        if not latest:
-            raise HTTPException(status_code=404, detail=f"No data found for state: {state}")
-        year = latest
-    
-    # Query data for the state
-    results = db.query(MigrationIndex).filter(
-        and_(
-            MigrationIndex.state == state,
-            MigrationIndex.year == year,
-            MigrationIndex.pincode.is_(None)  # District-level only
-        )
-    ).all()
-    
-    if not results:
-        raise HTTPException(
-            status_code=404, 
-            detail=f"No data found for state: {state} in year {year}"
+    summary = await run_in("db", state_summary, db, state, year)
+
+    if summary is None:
+        detail = (
+            f"No data found for state: {state} in year {year}"
+            if year is not None
+            else f"No data found for state: {state}"
         )
-    
-    # Aggregate metrics
-    total_child = sum(r.child_enrolments for r in results)
-    total_adult = sum(r.adult_updates for r in results)
-    
-    # Calculate weighted average migration index
-    valid_indices = [(r.migration_index, r.child_enrolments) for r in results if r.migration_index is not None]
-    if valid_indices:
-        avg_index = sum(idx * weight for idx, weight in valid_indices) / sum(weight for _, weight in valid_indices)
-    else:
-        avg_index = None
-    
+        raise HTTPException(status_code=404, detail=detail)
+
     # Determine status
-    status = interpret_index(avg_index)
-    
-    # Get top 5 districts by migration index
-    top_districts = sorted(
-        [{"district": r.district, "migration_index": r.migration_index} 
-         for r in results if r.migration_index is not None],
-        key=lambda x: x["migration_index"],
-        reverse=True
-    )[:5]
-    
+    status = interpret_index(summary["average_migration_index"])
+
     return StateSummaryResponse(
         state=state,
-        year=year,
-        total_child_enrolments=total_child,
-        total_adult_updates=total_adult,
-        average_migration_index=avg_index,
+        year=summary["year"],
+        total_child_enrolments=summary["total_child_enrolments"],
+        total_adult_updates=summary["total_adult_updates"],
+        average_migration_index=summary["average_migration_index"],
         status=status,
-        top_districts=top_districts
+        top_districts=summary["top_districts"]
     )
 
 
@@ -197,54 +182,25 @@ async def get_district_migration(
     - **district**: District name
     - **year**: Optional year filter (defaults to latest available year)
     """
-    # If no year specified, get the latest year
-    if year is None:
-        latest = db.query(func.max(MigrationIndex.year)).filter(
-            and_(
-                MigrationIndex.state == state,
-                MigrationIndex.district == district
-            )
-        ).scalar()
-        if not latest:
-            raise HTTPException(
-                status_code=404, 
-                detail=f"No data found for {district}, {state}"
-            )
-        year = latest
-    
-    # Query data for the district
-    results = db.query(MigrationIndex).filter(
-        and_(
-            MigrationIndex.state == state,
-            MigrationIndex.district == district,
-            MigrationIndex.year == year,
-            MigrationIndex.pincode.is_(None)  # District-level only
-        )
-    ).all()
-    
-    if not results:
-        raise HTTPException(
-            status_code=404,
-            detail=f"No data found for {district}, {state} in year {year}"
+    summary = await run_in("db", district_summary, db, state, district, year)
+
+    if summary is None:
+        detail = (
+            f"No data found for {district}, {state} in year {year}"
+            if year is not None
+            else f"No data found for {district}, {state}"
         )
-    
-    # Aggregate metrics
-    total_child = sum(r.child_enrolments for r in results)
-    total_adult = sum(r.adult_updates for r in results)
-    
-    # Calculate average migration index
-    valid_indices = [r.migration_index for r in results if r.migration_index is not None]
-    avg_index = sum(valid_indices) / len(valid_indices) if valid_indices else None
-    
-    status = interpret_index(avg_index)
-    
+        raise HTTPException(status_code=404, detail=detail)
+
+    status = interpret_index(summary["average_migration_index"])
+
     return DistrictSummaryResponse(
         state=state,
         district=district,
-        year=year,
-        total_child_enrolments=total_child,
-        total_adult_updates=total_adult,
-        average_migration_index=avg_index,
+        year=summary["year"],
+        total_child_enrolments=summary["total_child_enrolments"],
+        total_adult_updates=summary["total_adult_updates"],
+        average_migration_index=summary["average_migration_index"],
         status=status
     )
 
@@ -261,49 +217,26 @@ async def get_pincode_migration(
     - **pincode**: PIN code
     - **year**: Optional year filter (defaults to latest available year)
     """
-    # If no year specified, get the latest year
-    if year is None:
-        latest = db.query(func.max(MigrationIndex.year)).filter(
-            MigrationIndex.pincode == pincode
-        ).scalar()
-        if not latest:
-            raise HTTPException(status_code=404, detail=f"No data found for pincode: {pincode}")
-        year = latest
-    
-    # Query data for the pincode
-    results = db.query(MigrationIndex).filter(
-        and_(
-            MigrationIndex.pincode == pincode,
-            MigrationIndex.year == year
-        )
-    ).all()
-    
-    if not results:
-        raise HTTPException(
-            status_code=404,
-            detail=f"No data found for pincode: {pincode} in year {year}"
+    summary = await run_in("db", pincode_summary, db, pincode, year)
+
+    if summary is None:
+        detail = (
+            f"No data found for pincode: {pincode} in year {year}"
+            if year is not None
+            else f"No data found for pincode: {pincode}"
         )
-    
-    # Aggregate metrics
-    total_child = sum(r.child_enrolments for r in results)
-    total_adult = sum(r.adult_updates for r in results)
-    
-    valid_indices = [r.migration_index for r in results if r.migration_index is not None]
-    avg_index = sum(valid_indices) / len(valid_indices) if valid_indices else None
-    
-    status = interpret_index(avg_index)
-    
-    # Get state and district from first result
-    first_result = results[0]
-    
+        raise HTTPException(status_code=404, detail=detail)
+
+    status = interpret_index(summary["average_migration_index"])
+
     return PincodeSummaryResponse(
-        state=first_result.state,
-        district=first_result.district,
+        state=summary["state"],
+        district=summary["district"],
         pincode=pincode,
-        year=year,
-        total_child_enrolments=total_child,
-        total_adult_updates=total_adult,
-        average_migration_index=avg_index,
+        year=summary["year"],
+        total_child_enrolments=summary["total_child_enrolments"],
+        total_adult_updates=summary["total_adult_updates"],
+        average_migration_index=summary["average_migration_index"],
         status=status
     )
 
@@ -324,26 +257,12 @@ async def get_migration_trend(
     - **start_date**: Optional start date (format: DD-MM-YYYY)
     - **end_date**: Optional end date (format: DD-MM-YYYY)
     """
-    # Build query
-    query = db.query(MigrationIndex).filter(
-        and_(
-            MigrationIndex.state == state,
-            MigrationIndex.district == district,
-            MigrationIndex.pincode.is_(None)
-        )
-    )
-    
-    # Apply date filters if provided
-    if start_date:
-        start = datetime.strptime(start_date, "%d-%m-%Y").date()
-        query = query.filter(MigrationIndex.date >= start)
+    # Parse date filters if provided
+    start = datetime.strptime(start_date, "%d-%m-%Y").date() if start_date else None
+    end = datetime.strptime(end_date, "%d-%m-%Y").date() if end_date else None
     
-    if end_date:
-        end = datetime.strptime(end_date, "%d-%m-%Y").date()
-        query = query.filter(MigrationIndex.date <= end)
-    
-    # Order by date
-    results = query.order_by(MigrationIndex.date).all()
+    # District-level rows ordered by date
+    results = await run_in("db", trend_rows, db, state, district, start, end)
     
     if not results:
         raise HTTPException(
@@ -406,14 +325,7 @@ async def get_raw_migration_data(
     - **district**: Optional district filter
     - **limit**: Maximum records to return (max 1000)
     """
-    query = db.query(MigrationIndex)
-    
-    if state:
-        query = query.filter(MigrationIndex.state == state)
-    if district:
-        query = query.filter(MigrationIndex.district == district)
-    
-    results = query.order_by(desc(MigrationIndex.date)).limit(limit).all()
+    results = await run_in("db", raw_rows, db, state, district, limit)
     
     return [
         MigrationIndexResponse(
@@ -446,55 +358,25 @@ def interpret_index(index_value):
         return "Very High Migration"
 
 
-@app.get("/migration/forecast/{state}/{district}")
-async def forecast_migration(
-    state: str,
-    district: str,
-    days: int = Query(30, ge=7, le=180, description="Number of days to forecast (7-180)"),
-    method: str = Query("prophet", description="Forecasting method: 'prophet', 'arima', or 'ensemble'"),
-    db: Session = Depends(get_db)
-):
+@app.get("/migration/forecast/jobs")
+async def forecast_jobs():
     """
-    🔮 Forecast future migration index for a district using ML models
-    
-    - **state**: State name
-    - **district**: District name
-    - **days**: Number of days to forecast (default: 30, max: 180)
-    - **method**: Forecasting method - 'prophet' (recommended), 'arima', or 'ensemble'
+    Progress of the background forecast precomputation job
     
     **Returns:**
-    - Historical trend analysis
-    - Future predictions with confidence intervals
-    - Migration pressure interpretation
-    - Policy recommendations
-    
-    **Example:**
-    ```
-    GET /migration/forecast/Karnataka/Bengaluru%20Urban?days=60&method=prophet
-    ```
+    - status (idle / running / standby / error), data version being precomputed;
+      standby means another server process holds the scheduler lock
+    - total, completed, cached and failed district counts
+    - most requested districts (precomputed first)
     """
-    if method not in ['prophet', 'arima', 'ensemble']:
-        raise HTTPException(
-            status_code=400, 
-            detail="Invalid method. Choose 'prophet', 'arima', or 'ensemble'"
-        )
-    
-    # Create forecaster
-    forecaster = MigrationForecaster(db)
-    
-    # Generate forecast
-    result = forecaster.ensemble_forecast(state, district, periods=days, method=method)
-    
-    if 'error' in result:
-        raise HTTPException(status_code=404, detail=result['message'])
-    
-    return result
+    return forecast_scheduler.job_progress()
 
 
 @app.get("/migration/forecast/top-growth/{state}")
 async def forecast_top_growth(
     state: str,
     top_n: int = Query(10, ge=1, le=20, description="Number of top districts to return"),
+    method: str = Query("prophet", description="Forecasting method: 'prophet' or 'fast'"),
     db: Session = Depends(get_db)
 ):
     """
@@ -502,6 +384,7 @@ async def forecast_top_growth(
     
     - **state**: State name
     - **top_n**: Number of top districts to return (default: 10, max: 20)
+    - **method**: 'prophet' (default) or 'fast' (all districts in one batched fit)
     
     **Returns:**
     - List of districts ranked by predicted migration pressure
@@ -517,10 +400,18 @@ async def forecast_top_growth(
     GET /migration/forecast/top-growth/Karnataka?top_n=5
     ```
     """
+    if method not in ['prophet', 'fast']:
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid method. Choose 'prophet' or 'fast'"
+        )
+    
     forecaster = MigrationForecaster(db)
     
     try:
-        predictions = forecaster.get_top_growth_predictions(state, top_n)
+        predictions = await run_in(
+            "forecast", forecaster.get_top_growth_predictions, state, top_n, method=method
+        )
         
         if not predictions:
             raise HTTPException(
@@ -539,6 +430,56 @@ async def forecast_top_growth(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/migration/forecast/{state}/{district}")
+async def forecast_migration(
+    state: str,
+    district: str,
+    days: int = Query(30, ge=7, le=180, description="Number of days to forecast (7-180)"),
+    method: str = Query("prophet", description="Forecasting method: 'prophet', 'arima', 'ensemble' or 'fast'"),
+    db: Session = Depends(get_db)
+):
+    """
+    🔮 Forecast future migration index for a district using ML models
+    
+    - **state**: State name
+    - **district**: District name
+    - **days**: Number of days to forecast (default: 30, max: 180)
+    - **method**: Forecasting method - 'prophet' (recommended), 'arima', 'ensemble',
+      or 'fast' (NumPy Holt-Winters, milliseconds per district)
+    
+    **Returns:**
+    - Historical trend analysis
+    - Future predictions with confidence intervals
+    - Migration pressure interpretation
+    - Policy recommendations
+    
+    **Example:**
+    ```
+    GET /migration/forecast/Karnataka/Bengaluru%20Urban?days=60&method=prophet
+    ```
+    """
+    if method not in ['prophet', 'arima', 'ensemble', 'fast']:
+        raise HTTPException(
+            status_code=400, 
+            detail="Invalid method. Choose 'prophet', 'arima', 'ensemble' or 'fast'"
+        )
+    
+    forecast_scheduler.record_request(state, district)
+    
+    # Create forecaster
+    forecaster = MigrationForecaster(db)
+    
+    # Generate forecast (served from the forecast store when precomputed)
+    result = await run_in(
+        "forecast", forecaster.ensemble_forecast, state, district, periods=days, method=method
+    )
+    
+    if 'error' in result:
+        raise HTTPException(status_code=404, detail=result['message'])
+    
+    return result
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host=config.API_HOST, port=config.API_PORT)
@@ -0,0 +1,263 @@
+"""
+Build the migration index fact tables from the cleaned datasets.
+
+    migration_index = (child_enrolments * 2 + adult_updates) / 1000
+
+- child_enrolments: enrolment age_0_5
+- adult_updates:    demographic update demo_age_17_
+
+Rows are written at two grains, each to its own table: district level
+(migration_district_daily) and pincode level (migration_pincode_daily).
+Usage:
+
+    python migration_etl.py                                  # full rebuild
+    python migration_etl.py --start-date 01-12-2025 --end-date 31-12-2025
+    python migration_etl.py --migrate-legacy                 # split a combined migration_index table
+"""
+
+import io
+import sys
+import argparse
+import time
+from datetime import datetime
+
+import pandas as pd
+from sqlalchemy import and_, delete
+
+from database import engine, init_db, legacy_facts_pending, split_legacy_facts
+from models import MigrationDistrictDaily, MigrationPincodeDaily
+import forecast_cache
+from app.services.data_loader import load_clean_csv
+from app.services.time_utils import parse_dates
+
+INSERT_BATCH_ROWS = 50000
+
+TABLE_COLUMNS = [
+    "date", "state", "district", "pincode",
+    "child_enrolments", "adult_updates", "migration_index",
+    "year", "month"
+]
+
+FACT_TABLES = [MigrationDistrictDaily.__table__, MigrationPincodeDaily.__table__]
+
+
+# -----------------------------
+# BUILD
+# -----------------------------
+
+def _load_counts(dataset_name, value_column, target_column, start=None, end=None):
+    df = load_clean_csv(
+        dataset_name,
+        columns=["date", "state", "district", "pincode", value_column]
+    )
+    if value_column not in df.columns:
+        raise ValueError(f"{dataset_name} has no {value_column} column")
+
+    df = df.assign(date=parse_dates(df["date"])).dropna(subset=["date"])
+
+    if start is not None:
+        df = df[df["date"] >= start]
+    if end is not None:
+        df = df[df["date"] <= end]
+
+    return df.rename(columns={value_column: target_column})
+
+
+def _rollup(enrolment, demographic, keys):
+    child = enrolment.groupby(keys, observed=True)["child_enrolments"].sum()
+    adult = demographic.groupby(keys, observed=True)["adult_updates"].sum()
+
+    df = pd.concat([child, adult], axis=1).fillna(0).astype("int64").reset_index()
+    for col in ["state", "district", "pincode"]:
+        if col in df.columns:
+            df[col] = df[col].astype(str)
+    return df
+
+
+def build_migration_frame(start=None, end=None, include_pincodes=True) -> pd.DataFrame:
+    """
+    Computes migration_index rows from the cleaned CSVs with vectorized
+    groupbys (both grains, optionally limited to a date range).
+    """
+    enrolment = _load_counts("enrolment", "age_0_5", "child_enrolments", start, end)
+    demographic = _load_counts("demographic_update", "demo_age_17_", "adult_updates", start, end)
+
+    frames = [_rollup(enrolment, demographic, ["state", "district", "date"])]
+    frames[0]["pincode"] = None
+
+    if include_pincodes:
+        frames.append(
+            _rollup(enrolment, demographic, ["state", "district", "pincode", "date"])
+        )
+
+    df = pd.concat(frames, ignore_index=True)
+    df["migration_index"] = (df["child_enrolments"] * 2 + df["adult_updates"]) / 1000
+    df["year"] = df["date"].dt.year
+    df["month"] = df["date"].dt.month
+    df["date"] = df["date"].dt.date
+
+    return df[TABLE_COLUMNS]
+
+
+# -----------------------------
+# LOAD
+# -----------------------------
+
+def _table_columns(table):
+    return [col for col in TABLE_COLUMNS if col in table.columns]
+
+
+def _copy_rows(conn, table, df):
+    """
+    PostgreSQL fast path: stream the frame through COPY on the
+    transaction's own DBAPI connection.
+    """
+    columns = _table_columns(table)
+    buffer = io.StringIO()
+    df[columns].to_csv(buffer, index=False, header=False)
+    buffer.seek(0)
+
+    cursor = conn.connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {table.name} ({', '.join(columns)}) "
+            f"FROM STDIN WITH (FORMAT csv)",
+            buffer
+        )
+    finally:
+        cursor.close()
+
+
+_PLACEHOLDERS = {"qmark": "?", "format": "%s", "pyformat": "%s"}
+
+
+def _insert_rows(conn, table, df):
+    """
+    Generic path: one DBAPI executemany per batch of plain tuples,
+    skipping per-row SQLAlchemy parameter processing.
+    """
+    columns = _table_columns(table)
+    df = df[columns]
+
+    placeholder = _PLACEHOLDERS.get(engine.dialect.paramstyle)
+    if placeholder is None:
+        records = df.astype(object).where(df.notna(), None).to_dict("records")
+        for offset in range(0, len(records), INSERT_BATCH_ROWS):
+            conn.execute(table.insert(), records[offset:offset + INSERT_BATCH_ROWS])
+        return
+
+    if engine.dialect.name == "sqlite":
+        # Same ISO text SQLAlchemy's Date type stores on SQLite
+        df = df.assign(date=[d.isoformat() for d in df["date"]])
+
+    values = [
+        df[col].astype(object).where(df[col].notna(), None).tolist()
+        for col in columns
+    ]
+    rows = list(zip(*values))
+
+    sql = (
+        f"INSERT INTO {table.name} ({', '.join(columns)}) "
+        f"VALUES ({', '.join([placeholder] * len(columns))})"
+    )
+    for offset in range(0, len(rows), INSERT_BATCH_ROWS):
+        conn.exec_driver_sql(sql, rows[offset:offset + INSERT_BATCH_ROWS])
+
+
+def load_migration_index(start=None, end=None, include_pincodes=True) -> dict:
+    """
+    Replaces the rows of both fact tables (all of them, or only those
+    inside [start, end]) with freshly computed ones in a single
+    transaction.
+
+    - start / end: optional datetime bounds for incremental loads
+    - include_pincodes: when False, the pincode table is left untouched
+    """
+    init_db()
+    if legacy_facts_pending():
+        raise RuntimeError(
+            "Database still has the combined migration_index table; "
+            "run `python migration_etl.py --migrate-legacy` first"
+        )
+
+    began = time.perf_counter()
+    df = build_migration_frame(start, end, include_pincodes)
+    built = time.perf_counter()
+
+    grains = {
+        MigrationDistrictDaily.__table__: df[df["pincode"].isna()],
+        MigrationPincodeDaily.__table__: df[df["pincode"].notna()],
+    }
+
+    tables = FACT_TABLES if include_pincodes else [MigrationDistrictDaily.__table__]
+
+    deleted = {}
+    with engine.begin() as conn:
+        for table in tables:
+            stmt = delete(table)
+            if start is not None or end is not None:
+                conditions = []
+                if start is not None:
+                    conditions.append(table.c.date >= start.date())
+                if end is not None:
+                    conditions.append(table.c.date <= end.date())
+                stmt = stmt.where(and_(*conditions))
+            deleted[table.name] = conn.execute(stmt).rowcount
+
+            if engine.dialect.name == "postgresql" and engine.dialect.driver == "psycopg2":
+                _copy_rows(conn, table, grains[table])
+            else:
+                _insert_rows(conn, table, grains[table])
+
+    # Cached forecasts for these districts describe the old rows
+    if start is None and end is None:
+        forecast_cache.invalidate()
+    else:
+        districts = grains[MigrationDistrictDaily.__table__][["state", "district"]].drop_duplicates()
+        forecast_cache.invalidate(districts.itertuples(index=False, name=None))
+
+    finished = time.perf_counter()
+
+    return {
+        "rows_deleted": deleted,
+        "rows_inserted": len(df),
+        "district_rows": len(grains[MigrationDistrictDaily.__table__]),
+        "pincode_rows": len(grains[MigrationPincodeDaily.__table__]),
+        "build_seconds": round(built - began, 3),
+        "load_seconds": round(finished - built, 3)
+    }
+
+
+def _parse_cli_date(value):
+    return datetime.strptime(value, "%d-%m-%Y")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Populate the migration index tables from cleaned data")
+    parser.add_argument("--start-date", type=_parse_cli_date, help="DD-MM-YYYY (inclusive)")
+    parser.add_argument("--end-date", type=_parse_cli_date, help="DD-MM-YYYY (inclusive)")
+    parser.add_argument("--no-pincodes", action="store_true", help="only load district-level rows")
+    parser.add_argument("--migrate-legacy", action="store_true",
+                        help="split a combined migration_index table into the per-grain tables and exit")
+    args = parser.parse_args()
+
+    if args.migrate_legacy:
+        moved = split_legacy_facts()
+        if moved is None:
+            print("✅ No legacy migration_index table to split")
+        else:
+            print(f"✅ Split migration_index: {moved[0]} district rows, {moved[1]} pincode rows "
+                  f"(restart running API processes)")
+        sys.exit(0)
+
+    summary = load_migration_index(
+        start=args.start_date,
+        end=args.end_date,
+        include_pincodes=not args.no_pincodes
+    )
+
+    replaced = ", ".join(f"{count} {table}" for table, count in summary["rows_deleted"].items())
+    print(f"✅ Migration index: {summary['rows_inserted']} rows inserted "
+          f"({summary['district_rows']} district, {summary['pincode_rows']} pincode), "
+          f"replaced {replaced}")
+    print(f"   build {summary['build_seconds']}s, load {summary['load_seconds']}s")
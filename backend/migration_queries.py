@@ -0,0 +1,176 @@
+"""
+Queries behind the /migration endpoints.
+
+Each summary is a single SQL statement that returns only the result
+row(s): totals, averages and top-N ordering are computed by the
+database instead of hydrating every matching fact row. District and
+state queries read MigrationDistrictDaily, pincode queries read
+MigrationPincodeDaily. When no year is given, the latest year is
+resolved in the same statement through a scalar subquery.
+"""
+
+from sqlalchemy import and_, case, desc, func, literal, null
+from sqlalchemy.orm import Session
+
+from models import MigrationDistrictDaily, MigrationPincodeDaily
+
+TOP_DISTRICTS = 5
+
+RAW_COLUMNS = [
+    "state", "district", "date", "year", "month",
+    "child_enrolments", "adult_updates", "migration_index"
+]
+
+
+def _year_filter(db: Session, model, year, *conditions):
+    if year is not None:
+        return model.year == literal(year)
+
+    latest = (
+        db.query(func.max(model.year))
+        .filter(and_(*conditions))
+        .scalar_subquery()
+    )
+    return model.year == latest
+
+
+def state_summary(db: Session, state: str, year: int = None):
+    """
+    Totals, child-enrolment weighted average index and the top
+    district rows for a state.
+    Returns None when nothing matches.
+    """
+    weighted_sum = func.sum(
+        MigrationDistrictDaily.migration_index * MigrationDistrictDaily.child_enrolments
+    ).over()
+    weight = func.sum(
+        case(
+            (MigrationDistrictDaily.migration_index.isnot(None), MigrationDistrictDaily.child_enrolments)
+        )
+    ).over()
+
+    rows = db.query(
+        MigrationDistrictDaily.district,
+        MigrationDistrictDaily.migration_index,
+        MigrationDistrictDaily.year,
+        func.sum(MigrationDistrictDaily.child_enrolments).over().label("total_child"),
+        func.sum(MigrationDistrictDaily.adult_updates).over().label("total_adult"),
+        (weighted_sum / func.nullif(weight, 0)).label("average_index")
+    ).filter(
+        MigrationDistrictDaily.state == state,
+        _year_filter(db, MigrationDistrictDaily, year, MigrationDistrictDaily.state == state)
+    ).order_by(
+        MigrationDistrictDaily.migration_index.desc().nullslast()
+    ).limit(TOP_DISTRICTS).all()
+
+    if not rows:
+        return None
+
+    first = rows[0]
+    return {
+        "year": first.year,
+        "total_child_enrolments": int(first.total_child or 0),
+        "total_adult_updates": int(first.total_adult or 0),
+        "average_migration_index": first.average_index,
+        "top_districts": [
+            {"district": r.district, "migration_index": r.migration_index}
+            for r in rows
+            if r.migration_index is not None
+        ]
+    }
+
+
+def _totals(db: Session, model, scope: list, year):
+    """
+    - model: fact table of the grain being summarised
+    - scope: filters for the aggregated rows, which also bound the
+      latest-year lookup
+    """
+    row = db.query(
+        func.count().label("rows"),
+        func.max(model.year).label("year"),
+        func.sum(model.child_enrolments).label("total_child"),
+        func.sum(model.adult_updates).label("total_adult"),
+        func.avg(model.migration_index).label("average_index"),
+        func.min(model.state).label("state"),
+        func.min(model.district).label("district")
+    ).filter(
+        *scope,
+        _year_filter(db, model, year, *scope)
+    ).one()
+
+    if not row.rows:
+        return None
+
+    return {
+        "state": row.state,
+        "district": row.district,
+        "year": row.year,
+        "total_child_enrolments": int(row.total_child or 0),
+        "total_adult_updates": int(row.total_adult or 0),
+        "average_migration_index": row.average_index
+    }
+
+
+def district_summary(db: Session, state: str, district: str, year: int = None):
+    """
+    Totals and average index for one district.
+    """
+    return _totals(
+        db,
+        MigrationDistrictDaily,
+        [MigrationDistrictDaily.state == state, MigrationDistrictDaily.district == district],
+        year
+    )
+
+
+def pincode_summary(db: Session, pincode: str, year: int = None):
+    """
+    Totals and average index for one pincode, with the state and
+    district it belongs to.
+    """
+    return _totals(db, MigrationPincodeDaily, [MigrationPincodeDaily.pincode == pincode], year)
+
+
+def trend_rows(db: Session, state: str, district: str, start=None, end=None) -> list:
+    """
+    District-level rows for one district, oldest first,
+    optionally bounded by dates.
+    """
+    query = db.query(MigrationDistrictDaily).filter(
+        MigrationDistrictDaily.state == state,
+        MigrationDistrictDaily.district == district
+    )
+
+    if start is not None:
+        query = query.filter(MigrationDistrictDaily.date >= start)
+    if end is not None:
+        query = query.filter(MigrationDistrictDaily.date <= end)
+
+    return query.order_by(MigrationDistrictDaily.date).all()
+
+
+def raw_rows(db: Session, state: str = None, district: str = None, limit: int = 100) -> list:
+    """
+    Most recent rows of both grains, optionally filtered by
+    state / district. District-level rows have pincode None.
+    """
+    rows = []
+    for model, pincode in (
+        (MigrationDistrictDaily, null()),
+        (MigrationPincodeDaily, MigrationPincodeDaily.pincode)
+    ):
+        query = db.query(
+            *(getattr(model, col) for col in RAW_COLUMNS),
+            pincode.label("pincode")
+        )
+
+        if state:
+            query = query.filter(model.state == state)
+        if district:
+            query = query.filter(model.district == district)
+
+        rows += query.order_by(desc(model.date)).limit(limit).all()
+
+    rows.sort(key=lambda r: r.date, reverse=True)
+    return rows[:limit]
@@ -2,15 +2,61 @@
 from sqlalchemy import Column, Integer, String, Float, Date, Index
 from database import Base
 
-class MigrationIndex(Base):
+# Migration index facts are stored per grain: district-level rows
+# (every district and state query) live apart from the far more numerous
+# pincode-level rows, so district reads never walk pincode data.
+# Indexes follow the queries in migration_queries.py, forecasting.py and
+# forecast_cache.py (checked by tests/test_query_plans.py).
+
+class MigrationDistrictDaily(Base):
     """Migration Index aggregated by district and date"""
-    __tablename__ = "migration_index"
+    __tablename__ = "migration_district_daily"
     
-    id = Column(Integer, primary_key=True, index=True)
-    date = Column(Date, nullable=False, index=True)
-    state = Column(String, nullable=False, index=True)
-    district = Column(String, nullable=False, index=True)
-    pincode = Column(String, nullable=True, index=True)
+    id = Column(Integer, primary_key=True)
+    date = Column(Date, nullable=False, index=True)  # ETL date-range deletes, latest rows
+    state = Column(String, nullable=False)
+    district = Column(String, nullable=False)
+    
+    # Raw counts
+    child_enrolments = Column(Integer, default=0)  # age_0_5
+    adult_updates = Column(Integer, default=0)     # demo_age_17_plus
+    
+    # Calculated index
+    migration_index = Column(Float, nullable=True)
+    
+    # Metadata
+    year = Column(Integer, nullable=False)
+    month = Column(Integer, nullable=False)
+    
+    __table_args__ = (
+        # Per district: ordered trend and history scans, district totals,
+        # per-state district lists and data versions (covering)
+        Index(
+            'idx_district_daily_district',
+            'state', 'district', 'date',
+            'year', 'migration_index', 'child_enrolments', 'adult_updates'
+        ),
+        # Per state and year: state summaries, distinct states (covering)
+        Index(
+            'idx_district_daily_state_year',
+            'state', 'year',
+            'district', 'migration_index', 'child_enrolments', 'adult_updates'
+        ),
+    )
+    
+    def __repr__(self):
+        return f"<MigrationDistrictDaily(state={self.state}, district={self.district}, date={self.date}, index={self.migration_index})>"
+
+
+class MigrationPincodeDaily(Base):
+    """Migration Index aggregated by pincode and date"""
+    __tablename__ = "migration_pincode_daily"
+    
+    id = Column(Integer, primary_key=True)
+    date = Column(Date, nullable=False, index=True)  # ETL date-range deletes, latest rows
+    state = Column(String, nullable=False)
+    district = Column(String, nullable=False)
+    pincode = Column(String, nullable=False)
     
     # Raw counts
     child_enrolments = Column(Integer, default=0)  # age_0_5
@@ -20,18 +66,22 @@ class MigrationIndex(Base):
     migration_index = Column(Float, nullable=True)
     
     # Metadata
-    year = Column(Integer, nullable=False, index=True)
+    year = Column(Integer, nullable=False)
     month = Column(Integer, nullable=False)
     
-    # Composite indexes for faster queries
     __table_args__ = (
-        Index('idx_state_district_date', 'state', 'district', 'date'),
-        Index('idx_pincode_date', 'pincode', 'date'),
-        Index('idx_state_year', 'state', 'year'),
+        # Pincode totals for the latest year (covering)
+        Index(
+            'idx_pincode_daily_pincode',
+            'pincode', 'year',
+            'migration_index', 'child_enrolments', 'adult_updates', 'state', 'district'
+        ),
+        # Raw rows by state / district, newest first
+        Index('idx_pincode_daily_district', 'state', 'district', 'date'),
     )
     
     def __repr__(self):
-        return f"<MigrationIndex(state={self.state}, district={self.district}, date={self.date}, index={self.migration_index})>"
+        return f"<MigrationPincodeDaily(pincode={self.pincode}, district={self.district}, date={self.date}, index={self.migration_index})>"
 
 
 class EnrolmentData(Base):
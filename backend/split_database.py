@@ -1,43 +1,145 @@
 """
 Split large database file into smaller chunks for GitHub upload.
 Chunks are combined automatically on app startup.
+
+Alongside the chunks, db_chunks/manifest.json records each chunk's
+offset, size and SHA-256 and the SHA-256 of the whole database, which
+combine_chunks.py verifies before serving the reassembled file.
+
+Usage:
+    python split_database.py [--compress none|auto|zstd|lz4|gzip] [--workers N]
+
+Compressed chunks are independent frames (see chunk_codecs.py) written
+in parallel; CHUNK_SIZE bounds the uncompressed bytes per chunk.
 """
 
 import os
 import sys
+import glob
+import json
+import sqlite3
+import hashlib
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+from chunk_codecs import CODEC_SUFFIXES, resolve_codec, open_writer
 
 CHUNK_SIZE = 95 * 1024 * 1024  # 95MB per chunk (safely under 100MB limit)
 DB_FILE = "aadhaar_pulse.db"
 CHUNK_DIR = "db_chunks"
+MANIFEST_FILE = os.path.join(CHUNK_DIR, "manifest.json")
+COPY_BUFFER_SIZE = 1024 * 1024  # bytes held in memory at a time, per worker
+SPLIT_WORKERS = int(os.getenv("DB_CHUNK_WORKERS", min(4, os.cpu_count() or 1)))
+
+def _remove_old_chunks():
+    """Chunks left from a larger database would otherwise be combined too"""
+    for path in glob.glob(os.path.join(CHUNK_DIR, f"{DB_FILE}.chunk*")):
+        os.remove(path)
+    if os.path.exists(MANIFEST_FILE):
+        os.remove(MANIFEST_FILE)
+
+def _checkpoint_wal():
+    """Under WAL, recent commits may only exist in the -wal file until checkpointed"""
+    if not os.path.exists(f"{DB_FILE}-wal"):
+        return
+    conn = sqlite3.connect(DB_FILE)
+    try:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    finally:
+        conn.close()
+
+def _write_chunk(fd, offset, size, chunk_file, codec):
+    """Copies [offset, offset + size) of the database into one chunk file"""
+    digest = hashlib.sha256()
+    end = offset + size
+
+    with open_writer(chunk_file, codec) as chunk_f:
+        while offset < end:
+            data = os.pread(fd, min(COPY_BUFFER_SIZE, end - offset), offset)
+            if not data:
+                raise ValueError(f"{DB_FILE} shrank while being split")
+            chunk_f.write(data)
+            digest.update(data)
+            offset += len(data)
+
+    return digest.hexdigest()
 
-def split_database():
-    """Split database into chunks"""
+def _file_sha256(fd, size):
+    digest = hashlib.sha256()
+    offset = 0
+    while offset < size:
+        data = os.pread(fd, min(COPY_BUFFER_SIZE, size - offset), offset)
+        digest.update(data)
+        offset += len(data)
+    return digest.hexdigest()
+
+def split_database(compression=None, workers=None):
+    """
+    Split database into chunks
+
+    - compression: none (default) | auto | zstd | lz4 | gzip
+    - workers: chunks written concurrently (default DB_CHUNK_WORKERS)
+    """
     if not os.path.exists(DB_FILE):
         print(f"❌ {DB_FILE} not found!")
         return False
-    
+
+    codec = resolve_codec(compression)
+    _checkpoint_wal()
     file_size = os.path.getsize(DB_FILE)
-    print(f"📦 Splitting {DB_FILE} ({file_size / (1024**2):.1f}MB)")
-    
+    print(f"📦 Splitting {DB_FILE} ({file_size / (1024**2):.1f}MB, compression: {codec})")
+
     # Create chunk directory
     os.makedirs(CHUNK_DIR, exist_ok=True)
-    
-    chunk_num = 1
-    with open(DB_FILE, 'rb') as f:
-        while True:
-            chunk_data = f.read(CHUNK_SIZE)
-            if not chunk_data:
-                break
-            
-            chunk_file = os.path.join(CHUNK_DIR, f"{DB_FILE}.chunk{chunk_num:02d}")
-            with open(chunk_file, 'wb') as chunk_f:
-                chunk_f.write(chunk_data)
-            
-            print(f"  ✓ {chunk_file} ({len(chunk_data) / (1024**2):.1f}MB)")
-            chunk_num += 1
-    
-    print(f"✅ Split into {chunk_num - 1} chunks")
+    _remove_old_chunks()
+
+    chunks = []
+    for offset in range(0, file_size, CHUNK_SIZE):
+        chunks.append({
+            "file": f"{DB_FILE}.chunk{len(chunks) + 1:02d}{CODEC_SUFFIXES[codec]}",
+            "offset": offset,
+            "size": min(CHUNK_SIZE, file_size - offset)
+        })
+
+    fd = os.open(DB_FILE, os.O_RDONLY)
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers or SPLIT_WORKERS)) as pool:
+            whole = pool.submit(_file_sha256, fd, file_size)
+            hashes = pool.map(
+                lambda chunk: _write_chunk(
+                    fd, chunk["offset"], chunk["size"],
+                    os.path.join(CHUNK_DIR, chunk["file"]), codec
+                ),
+                chunks
+            )
+            for chunk, sha256 in zip(chunks, hashes):
+                chunk["sha256"] = sha256
+                chunk["stored_size"] = os.path.getsize(os.path.join(CHUNK_DIR, chunk["file"]))
+                print(f"  ✓ {chunk['file']} ({chunk['stored_size'] / (1024**2):.1f}MB)")
+            whole_sha256 = whole.result()
+    finally:
+        os.close(fd)
+
+    manifest = {
+        "db_file": DB_FILE,
+        "size": file_size,
+        "sha256": whole_sha256,
+        "compression": codec,
+        "chunks": chunks
+    }
+    tmp_manifest = f"{MANIFEST_FILE}.tmp"
+    with open(tmp_manifest, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_manifest, MANIFEST_FILE)
+
+    stored = sum(chunk["stored_size"] for chunk in chunks)
+    print(f"✅ Split into {len(chunks)} chunks, {stored / (1024**2):.1f}MB stored (manifest: {MANIFEST_FILE})")
     return True
 
 if __name__ == "__main__":
-    split_database()
+    parser = argparse.ArgumentParser(description="Split the database into chunks")
+    parser.add_argument("--compress", default="none", choices=["none", "auto"] + list(CODEC_SUFFIXES)[1:])
+    parser.add_argument("--workers", type=int, default=SPLIT_WORKERS)
+    args = parser.parse_args()
+
+    sys.exit(0 if split_database(args.compress, args.workers) else 1)
@@ -0,0 +1,149 @@
+"""
+Query-plan regression tests for the hot migration index queries.
+
+Builds a throwaway SQLite database from the models (tables and declared
+indexes only, never the configured DATABASE_URL), fills it with a few
+fixture rows, runs every query behind the /migration endpoints, the
+forecaster and the forecast cache, and checks EXPLAIN QUERY PLAN for
+each statement they emit. A query fails when it scans a fact table,
+scans a whole index where it should seek, or sorts rows that should
+come out of an index already ordered.
+
+Run from backend/:
+    python -m pytest tests
+"""
+
+import re
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from database import Base
+from models import MigrationDistrictDaily, MigrationPincodeDaily
+import migration_queries
+import forecast_cache
+from forecasting import MigrationForecaster
+
+TABLES = [MigrationDistrictDaily.__tablename__, MigrationPincodeDaily.__tablename__]
+TABLE_PATTERN = "(?:" + "|".join(TABLES) + ")"
+
+SAMPLE = {"state": "Karnataka", "district": "Bengaluru Urban", "pincode": "560001", "year": 2025}
+
+# name -> (call(db, sample), allowed deviations)
+# - "index_scan": walking an index is inherent to the query (all states,
+#   all district-level rows, substring match on state) or bounded by a
+#   LIMIT over an index already in the requested order
+# - "sort": ordering by a computed value no index can provide
+HOT_QUERIES = {
+    "state_summary": (lambda db, s: migration_queries.state_summary(db, s["state"]), {"sort"}),
+    "state_summary_year": (lambda db, s: migration_queries.state_summary(db, s["state"], s["year"]), {"sort"}),
+    "district_summary": (lambda db, s: migration_queries.district_summary(db, s["state"], s["district"]), set()),
+    "pincode_summary": (lambda db, s: migration_queries.pincode_summary(db, s["pincode"]), set()),
+    "trend": (lambda db, s: migration_queries.trend_rows(db, s["state"], s["district"]), set()),
+    "trend_range": (
+        lambda db, s: migration_queries.trend_rows(
+            db, s["state"], s["district"], date(s["year"], 1, 1), date(s["year"], 12, 31)
+        ),
+        set()
+    ),
+    "raw_latest": (lambda db, s: migration_queries.raw_rows(db), {"index_scan"}),
+    "raw_district": (lambda db, s: migration_queries.raw_rows(db, s["state"], s["district"]), set()),
+    "available_states": (lambda db, s: MigrationForecaster(db).get_available_states(), {"index_scan"}),
+    "districts_for_state": (lambda db, s: MigrationForecaster(db).get_districts_for_state(s["state"]), {"index_scan"}),
+    "district_history": (lambda db, s: MigrationForecaster(db).get_historical_data(s["state"], s["district"]), set()),
+    "state_history": (lambda db, s: MigrationForecaster(db).get_state_historical_data(s["state"]), set()),
+    "district_data_version": (lambda db, s: forecast_cache.district_data_version(db, s["state"], s["district"]), set()),
+    "state_data_versions": (lambda db, s: forecast_cache.state_data_versions(db, s["state"]), set()),
+    "table_data_version": (lambda db, s: forecast_cache.table_data_version(db), {"index_scan"}),
+}
+
+
+def _fixture_rows():
+    places = [
+        ("Karnataka", "Bengaluru Urban", ["560001", "560002"]),
+        ("Karnataka", "Mysuru", ["570001"]),
+        ("Kerala", "Ernakulam", ["682001", "682002"]),
+    ]
+    districts, pincodes = [], []
+    for day in range(0, 720, 30):
+        current = date(2024, 1, 1) + timedelta(days=day)
+        for state, district, codes in places:
+            counts = {
+                "date": current, "state": state, "district": district,
+                "child_enrolments": 10 + day % 7, "adult_updates": 20 + day % 5,
+                "migration_index": 1.5, "year": current.year, "month": current.month
+            }
+            districts.append(counts)
+            pincodes.extend({**counts, "pincode": code} for code in codes)
+    return districts, pincodes
+
+
+@pytest.fixture(scope="module")
+def plan_db(tmp_path_factory):
+    path = tmp_path_factory.mktemp("plans") / "plans.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(
+        bind=engine,
+        tables=[MigrationDistrictDaily.__table__, MigrationPincodeDaily.__table__]
+    )
+
+    districts, pincodes = _fixture_rows()
+    with engine.begin() as conn:
+        conn.execute(MigrationDistrictDaily.__table__.insert(), districts)
+        conn.execute(MigrationPincodeDaily.__table__.insert(), pincodes)
+
+    session = sessionmaker(bind=engine)()
+    try:
+        yield engine, session
+    finally:
+        session.close()
+        engine.dispose()
+
+
+def _capture(engine, call, db, sample):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if re.search(rf"\bFROM {TABLE_PATTERN}\b", statement):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        call(db, sample)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return statements
+
+
+def _problems(plan, allowed):
+    problems = []
+    for detail in plan:
+        if re.match(rf"SCAN {TABLE_PATTERN}$", detail):
+            problems.append(f"full table scan: {detail}")
+        elif re.match(rf"SCAN {TABLE_PATTERN} USING ", detail) and "index_scan" not in allowed:
+            problems.append(f"index scan: {detail}")
+        elif "USE TEMP B-TREE" in detail and "sort" not in allowed:
+            problems.append(f"sort: {detail}")
+    return problems
+
+
+@pytest.mark.parametrize("name", list(HOT_QUERIES))
+def test_hot_query_uses_indexes(plan_db, name):
+    engine, db = plan_db
+    call, allowed = HOT_QUERIES[name]
+
+    statements = _capture(engine, call, db, SAMPLE)
+    assert statements, f"no query on {' / '.join(TABLES)} captured"
+
+    problems = []
+    with engine.connect() as conn:
+        for statement, parameters in statements:
+            plan = [
+                row[-1]
+                for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            ]
+            problems += [f"{problem} in {' '.join(statement.split())}" for problem in _problems(plan, allowed)]
+
+    assert not problems, "\n".join(problems)